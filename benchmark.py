@@ -0,0 +1,209 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy
+from scipy.spatial import cKDTree
+
+from core import (Vertex,
+                  Edge,
+                  Graph,
+                  Neuron,
+                  Microglia,
+                  CellGraph)
+from core.point import Point
+from core.mobility import Mobility
+# ___________________________________________________________________________ #
+
+''' Banc d'essai des opérateurs de graphe et du pas de temps '''
+
+SIZES = (10**2, 10**3, 10**4, 10**5, 10**6)
+TOPOLOGIES = ("chain", "geometric", "complete")
+
+# Au-delà, le graphe complet (n^2 / 2 arêtes) n'est plus raisonnable
+MAX_COMPLETE = 2000
+# Au-delà, la construction par objets Vertex / Edge et le CellGraph sont trop lents
+MAX_OBJECTS = 10**5
+
+# Degré moyen visé pour le graphe géométrique aléatoire
+GEOMETRIC_DEGREE = 8
+
+
+def make_edges(topology, n, rng):
+    """Extrémités (src, dst) et positions (n, 2) d'un graphe test."""
+    positions = rng.random((n, 2))
+    if topology == "chain":
+        return np.arange(n - 1), np.arange(1, n), positions
+    if topology == "geometric":
+        radius = np.sqrt(GEOMETRIC_DEGREE / (np.pi * n))
+        pairs = cKDTree(positions).query_pairs(radius, output_type="ndarray")
+        return pairs[:, 0], pairs[:, 1], positions
+    if topology == "complete":
+        src, dst = np.triu_indices(n, k=1)
+        return src, dst, positions
+    raise ValueError(f"Unknown topology: {topology!r}")
+
+
+def measure(func, setup=None, repeat=5):
+    """
+    Temps (min et médiane sur repeat exécutions) et pic mémoire (tracemalloc,
+    exécution séparée) de func(setup()).
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        gc.collect()
+        start = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - start)
+
+    arg = setup() if setup is not None else None
+    gc.collect()
+    tracemalloc.start()
+    func(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time_min": min(times), "time_median": float(np.median(times)), "repeat": repeat, "peak_bytes": peak}
+
+
+def bench_graph(topology, n, repeat, rng, dt=0.01, diffusion=1.0):
+    """Construction, laplaciens, divergence et pas de réaction–diffusion."""
+    src, dst, _ = make_edges(topology, n, rng)
+    u = rng.random(n)
+    c = rng.random(n)
+    results = {}
+
+    if n <= MAX_OBJECTS:
+        def construct(_):
+            vertices = [Vertex(ids=idx, value=0.0) for idx in range(n)]
+            edges = [Edge(extremity=[vertices[i], vertices[j]], coeff=1.0) for i, j in zip(src.tolist(), dst.tolist())]
+            return Graph(vertices, edges, sparse=True).get_edge_index()
+        results["graph_construction"] = measure(construct, repeat=repeat)
+
+    results["graph_from_edge_array"] = measure(lambda _: Graph.from_edge_array(src, dst, n=n), repeat=repeat)
+
+    def fresh_graph():
+        return Graph.from_edge_array(src, dst, n=n)
+
+    results["get_laplacian_matrix"] = measure(lambda G: G.get_laplacian_matrix(), fresh_graph, repeat)
+    results["get_normal_laplacian_matrix"] = measure(lambda G: G.get_normal_laplacian_matrix(), fresh_graph, repeat)
+
+    G = fresh_graph()
+    L = G.get_laplacian_matrix()
+    results["get_div_matrix"] = measure(lambda _: G.get_div_matrix(u, c), repeat=repeat)
+
+    def rd_step(_):
+        return u + dt * (-diffusion * (L @ u) + G.get_div_matrix(u, c) + u * (1 - u))
+    results["reaction_diffusion_step"] = measure(rd_step, repeat=repeat)
+    return len(src), results
+
+
+def bench_cellgraph(n, repeat, rng, radius_degree=GEOMETRIC_DEGREE, dt=0.01, skin=None):
+    """
+    CellGraph.update_graph (règle "radius") après un déplacement des
+    Microglia (un quart des cellules).
+    """
+    positions = rng.random((n, 2))
+    cells = [(Microglia if idx % 4 == 0 else Neuron)(pos=Point(x, y)) for idx, (x, y) in enumerate(positions.tolist())]
+    radius = np.sqrt(radius_degree / (np.pi * n))
+    cg = CellGraph(cells, connect_rule="radius", radius=radius, sparse=True, skin=skin,
+                   mobility=Mobility(seed=0, bounds=(0, 1)))
+
+    def moved():
+        cg.update_positions(dt=radius * dt, bounds=(0, 1))
+        return cg
+
+    results = {"cellgraph_update_graph": measure(lambda cg: cg.update_graph(), moved, repeat)}
+    return cg.graph.size, results
+
+
+def git_commit():
+    try:
+        # Commit du dépôt contenant ce script, quel que soit le répertoire courant
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=SIZES, topologies=TOPOLOGIES, repeat=5, seed=0, verbose=True):
+    """
+    Lance le banc d'essai et renvoie le rapport (dict sérialisable en JSON).
+    Chaque cas a son propre générateur : un graphe ne dépend que de seed,
+    de la topologie et de n.
+    """
+    rows = []
+
+    def add(topology, n, m, results):
+        for name, result in results.items():
+            row = {"benchmark": name, "topology": topology, "n": n, "m": int(m), **result}
+            rows.append(row)
+            if verbose:
+                print(f"{name:30s} {topology:10s} n={n:<8d} m={m:<9d} "
+                      f"{1e3 * row['time_min']:10.3f} ms {row['peak_bytes'] / 2**20:9.2f} MiB", flush=True)
+
+    for topology in topologies:
+        for n in sizes:
+            if topology == "complete" and n > MAX_COMPLETE:
+                continue
+            rng = np.random.default_rng((seed, TOPOLOGIES.index(topology), n))
+            m, results = bench_graph(topology, n, repeat, rng)
+            add(topology, n, m, results)
+
+    for n in sizes:
+        if n <= MAX_OBJECTS:
+            rng = np.random.default_rng((seed, len(TOPOLOGIES), n))
+            m, results = bench_cellgraph(n, repeat, rng)
+            add("geometric", n, m, results)
+
+    return {"meta": {"commit": git_commit(),
+                     "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "python": platform.python_version(),
+                     "numpy": np.__version__,
+                     "scipy": scipy.__version__,
+                     "machine": platform.machine(),
+                     "seed": seed,
+                     "repeat": repeat},
+            "results": rows}
+
+
+def compare(report, baseline):
+    """Tableau des rapports de temps report / baseline (> 1 : plus lent)."""
+    key = lambda row: (row["benchmark"], row["topology"], row["n"])
+    reference = {key(row): row for row in baseline["results"]}
+    print(f"\n{'benchmark':30s} {'topology':10s} {'n':>8s} {'time':>8s} {'memory':>8s}")
+    for row in report["results"]:
+        ref = reference.get(key(row))
+        if ref is None:
+            continue
+        time_ratio = row["time_min"] / ref["time_min"]
+        mem_ratio = row["peak_bytes"] / max(ref["peak_bytes"], 1)
+        print(f"{row['benchmark']:30s} {row['topology']:10s} {row['n']:8d} {time_ratio:8.2f} {mem_ratio:8.2f}")
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Banc d'essai des opérateurs de graphe.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--topologies", nargs="+", default=list(TOPOLOGIES), choices=TOPOLOGIES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json", help="rapport JSON")
+    parser.add_argument("--compare", default=None, help="rapport JSON de référence")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.topologies, args.repeat, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRapport écrit dans {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
@@ -2,4 +2,5 @@ from .cell import (Cell,
                    Neuron,
                    Astrocyte,
                    Microglia)
-
+from .population import CellPopulation
+from .history import PositionHistory
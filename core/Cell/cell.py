@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+
+import numpy as np
+
 from ..point import Point
 
 
@@ -28,13 +31,45 @@ class Cell(ABC):
 
         self._cell_type = self.CELL_TYPE
 
+        # Rattachement éventuel à une CellPopulation (cf. population.py)
+        self._population = None
+        self._index = None
+
         if pos is not None and not isinstance(pos, Point):
             raise TypeError(f"pos must be a Point or None, got {type(pos).__name__}")
         self.pos = pos.coord if pos else None
 
-        # Historique des positions
+        # Historique des positions (repris par la CellPopulation au rattachement)
         self._history = [tuple(self.pos)]
 
+    @property
+    def pos(self):
+        """Position ; vue sur la ligne de CellPopulation.positions si rattachée."""
+        if self._population is not None:
+            return self._population.positions[self._index]
+        return self._pos
+
+    @pos.setter
+    def pos(self, value):
+        if self._population is not None:
+            self._population.positions[self._index] = value
+        else:
+            self._pos = value
+
+    @property
+    def population(self):
+        return self._population
+
+    @property
+    def history(self):
+        """
+        Positions successives : np.array (k, d), vue sur l'historique de la
+        population si la cellule est rattachée.
+        """
+        if self._population is not None:
+            return self._population.history_of(self._index)
+        return np.array(self._history, dtype=float)
+
     @abstractmethod
     def activate(self):
         pass
@@ -46,8 +81,13 @@ class Cell(ABC):
         
         # Seules les Microglia peuvent se déplacer
         if isinstance(self, Microglia):
-            self.pos = new_pos.coord
-            self._history.append(tuple(self.pos))
+            if self._population is not None:
+                self._population.track_cells([self._index])
+                self.pos = new_pos.coord
+                self._population.record_history([self._index])
+            else:
+                self.pos = new_pos.coord
+                self._history.append(tuple(self.pos))
         else:
             raise AttributeError(f"{self.__class__.__name__} cells cannot move!")
 
@@ -55,7 +95,7 @@ class Cell(ABC):
         return (f"{self.__class__.__name__}(ids={self._ids}, "
                 f"global_id={self._global_id}, "
                 f"cell_type={self._cell_type}, pos={self.pos}, "
-                f"history={self._history})")
+                f"history={self._history if self._population is None else self.history.tolist()})")
 
     def __repr__(self):
         return self.__str__()
@@ -0,0 +1,202 @@
+import numpy as np
+
+
+''' Historique des positions d'une population, stocké dans un tableau préalloué '''
+
+class PositionHistory:
+    """
+    Historique des positions des cellules suivies d'une population de n
+    cellules, dans un tableau float (lignes, taille, d) : un échantillon
+    coûte d * 8 octets (16 en 2D).
+
+    Seules les cellules suivies ont une ligne : une cellule l'est à partir
+    de son premier enregistrement (record) ou de track. Rien n'est alloué
+    avant, et les deux dimensions du tableau doublent à la demande (à
+    partir de initial_size échantillons par ligne).
+
+    n, dim : nombre de cellules de la population et dimension
+    capacity : None (historique complet, le tableau double quand il est
+               plein) ou nombre d'échantillons gardés par cellule
+               (tampon circulaire : les plus anciens sont écrasés)
+    stride : on ne garde qu'un enregistrement sur stride, par cellule
+    """
+
+    def __init__(self, n, dim, capacity=None, stride=1, initial_size=1):
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"capacity must be a positive int or None, got {capacity!r}")
+        if stride < 1:
+            raise ValueError(f"stride must be a positive int, got {stride!r}")
+
+        self.capacity = capacity
+        self.stride = stride
+        self._n = n
+        # Cellules suivies (triées) et ligne du tampon de chacune
+        self._cells = np.empty(0, dtype=np.intp)
+        self._rows = np.empty(0, dtype=np.intp)
+        self._used = 0
+        self._buffer = np.empty((0, capacity if capacity else initial_size, dim))
+        self._count = np.empty(0, dtype=np.intp)
+        self._calls = np.empty(0, dtype=np.intp)
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def tracked(self):
+        """Indices (triés) des cellules suivies."""
+        return self._cells
+
+    @property
+    def lengths(self):
+        """Nombre d'échantillons disponibles par cellule (0 si non suivie) : np.array (n,)."""
+        lengths = np.zeros(self._n, dtype=np.intp)
+        count = self._count[self._rows]
+        lengths[self._cells] = np.minimum(count, self._buffer.shape[1]) if self.capacity else count
+        return lengths
+
+    @property
+    def nbytes(self):
+        return self._buffer.nbytes
+
+    def _lookup(self, idx):
+        # Ligne de chaque cellule de idx, -1 si elle n'est pas suivie
+        rows = np.full(len(idx), -1, dtype=np.intp)
+        if len(self._cells):
+            pos = np.minimum(np.searchsorted(self._cells, idx), len(self._cells) - 1)
+            found = self._cells[pos] == idx
+            rows[found] = self._rows[pos[found]]
+        return rows
+
+    def _add(self, idx):
+        # Lignes des cellules idx, allouées pour celles qui ne sont pas encore suivies
+        rows = self._lookup(idx)
+        new = rows < 0
+        if not new.any():
+            return rows
+        cells = np.unique(idx[new])
+        start = self._used
+        self._used += len(cells)
+        if self._used > self._buffer.shape[0]:
+            self._reserve(self._used)
+        added = np.arange(start, self._used)
+        self._count[added] = 0
+        self._calls[added] = 0
+
+        merged = np.concatenate((self._cells, cells))
+        order = np.argsort(merged, kind="stable")
+        self._cells = merged[order]
+        self._rows = np.concatenate((self._rows, added))[order]
+        return self._lookup(idx)
+
+    def _reserve(self, rows):
+        size = max(1, self._buffer.shape[0])
+        while size < rows:
+            size *= 2
+        buffer = np.empty((size,) + self._buffer.shape[1:])
+        buffer[:len(self._buffer)] = self._buffer
+        self._buffer = buffer
+        self._count = np.concatenate((self._count, np.zeros(size - len(self._count), dtype=np.intp)))
+        self._calls = np.concatenate((self._calls, np.zeros(size - len(self._calls), dtype=np.intp)))
+
+    def _grow(self, needed):
+        size = self._buffer.shape[1]
+        while size < needed:
+            size *= 2
+        buffer = np.empty((self._buffer.shape[0], size, self._buffer.shape[2]))
+        used = self._count[:self._used].max()
+        buffer[:self._used, :used] = self._buffer[:self._used, :used]
+        self._buffer = buffer
+
+    def _write(self, rows, samples):
+        count = self._count[rows]
+        if self.capacity is None:
+            if count.max() >= self._buffer.shape[1]:
+                self._grow(count.max() + 1)
+            slot = count
+        else:
+            slot = count % self.capacity
+        self._buffer[rows, slot] = samples
+        self._count[rows] += 1
+
+    def track(self, positions, idx):
+        """
+        Commence le suivi des cellules idx : leur position courante devient
+        leur premier échantillon. Sans effet pour les cellules déjà suivies.
+        """
+        idx = np.asarray(idx, dtype=np.intp)
+        if len(idx) == 0:
+            return
+        rows = self._add(idx)
+        fresh = self._count[rows] == 0
+        if fresh.any():
+            self._calls[rows[fresh]] = 1
+            self._write(rows[fresh], positions[idx[fresh]])
+
+    def record(self, positions, idx=None):
+        """
+        Enregistre positions[idx] pour les cellules idx (toutes par défaut),
+        en respectant stride ; une cellule non suivie l'est à partir de cet
+        enregistrement. idx ne doit pas contenir de doublons.
+        """
+        idx = np.arange(self._n) if idx is None else np.asarray(idx, dtype=np.intp)
+        if len(idx) == 0:
+            return
+        rows = self._add(idx)
+        fresh = self._count[rows] == 0
+        if fresh.any():
+            self.track(positions, idx[fresh])
+            idx, rows = idx[~fresh], rows[~fresh]
+        if self.stride > 1:
+            keep = self._calls[rows] % self.stride == 0
+            self._calls[rows] += 1
+            idx, rows = idx[keep], rows[keep]
+        if len(idx):
+            self._write(rows, positions[idx])
+
+    def set(self, idx, samples):
+        """Remplace l'historique de la cellule idx par samples (k, d)."""
+        samples = np.asarray(samples, dtype=float)
+        row = self._add(np.array([idx], dtype=np.intp))[0]
+        if self.capacity is not None:
+            samples = samples[-self.capacity:]
+        elif len(samples) > self._buffer.shape[1]:
+            self._grow(len(samples))
+        self._buffer[row, :len(samples)] = samples
+        self._count[row] = len(samples)
+        self._calls[row] = 0
+
+    def get(self, idx):
+        """
+        Positions successives de la cellule idx, de la plus ancienne à la
+        plus récente : np.array (k, d), vide si la cellule n'est pas suivie.
+
+        C'est une vue sur le tampon tant qu'il n'a pas fait le tour (toujours
+        le cas sans capacity) ; une fois le tampon circulaire plein, les
+        échantillons sont remis dans l'ordre dans une copie. Une vue n'est
+        plus mise à jour après un agrandissement du tampon.
+        """
+        row = self._lookup(np.array([idx], dtype=np.intp))[0]
+        if row < 0:
+            return np.empty((0, self._buffer.shape[2]))
+        count = self._count[row]
+        size = self._buffer.shape[1]
+        if count <= size:
+            return self._buffer[row, :count]
+        start = count % size
+        return np.concatenate((self._buffer[row, start:], self._buffer[row, :start]))
+
+    def last(self):
+        """
+        Dernière position enregistrée de chaque cellule suivie : np.array
+        (len(tracked), d), dans l'ordre de tracked.
+        """
+        count = self._count[self._rows]
+        return self._buffer[self._rows, (count - 1) % self._buffer.shape[1]]
+
+    def __str__(self):
+        _, size, d = self._buffer.shape
+        return (f"PositionHistory(n={self._n}, tracked={len(self._cells)}, dim={d}, capacity={self.capacity}, "
+                f"stride={self.stride}, size={size})")
+
+    def __repr__(self):
+        return self.__str__()
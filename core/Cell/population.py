@@ -0,0 +1,167 @@
+import numpy as np
+
+from .cell import Cell
+from .history import PositionHistory
+
+
+''' Stockage "structure of arrays" d'une population de cellules '''
+
+class CellPopulation:
+    """
+    Population de cellules stockée en tableaux :
+
+    positions : np.array (n, d) float
+    type_codes : np.array (n,) int, indice de la classe dans cell_types
+    ids : np.array (n,) int, identifiants globaux des cellules
+    cell_types : liste des classes (sous-classes de Cell) présentes
+    history_length, history_stride : options de l'historique des positions,
+                                     créé au premier enregistrement
+                                     (cf. track_history)
+
+    Les objets Cell rattachés à la population sont des vues : leur
+    attribut pos lit et écrit directement dans positions.
+    """
+
+    def __init__(self, positions, type_codes, ids, cell_types, history_length=None, history_stride=1):
+        self.positions = np.ascontiguousarray(positions, dtype=float)
+        self.type_codes = np.asarray(type_codes, dtype=np.intp)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.cell_types = list(cell_types)
+
+        if self.positions.ndim != 2 or len(self.positions) != len(self.type_codes) or len(self.ids) != len(self.type_codes):
+            raise ValueError("positions, type_codes and ids must describe the same number of cells.")
+
+        self._cells = [None] * len(self.ids)
+        self._masks = {}
+        self.history = None
+        self._history_options = (history_length, history_stride)
+
+    @classmethod
+    def from_cells(cls, cells, **kwargs):
+        """
+        Construit la population à partir d'objets Cell existants et les
+        rattache à celle-ci (leurs positions deviennent des vues, leur
+        historique est repris dans population.history).
+        """
+        cell_types = []
+        codes = np.empty(len(cells), dtype=np.intp)
+        for idx, cell in enumerate(cells):
+            if type(cell) not in cell_types:
+                cell_types.append(type(cell))
+            codes[idx] = cell_types.index(type(cell))
+
+        positions = np.array([cell.pos for cell in cells], dtype=float).reshape(len(cells), -1) if cells else np.empty((0, 2))
+        ids = np.array([cell._global_id for cell in cells], dtype=np.int64)
+
+        population = cls(positions, codes, ids, cell_types, **kwargs)
+        for idx, cell in enumerate(cells):
+            population._attach(cell, idx)
+        return population
+
+    @classmethod
+    def from_arrays(cls, positions, cell_types, type_codes, ids=None, **kwargs):
+        """
+        Construit directement une population de n cellules sans créer
+        d'objets Cell. Sans ids, des identifiants globaux sont réservés
+        via Cell._global_counter ; avec des ids explicites (relecture d'un
+        fichier), le compteur est avancé au-delà du plus grand pour que les
+        cellules créées ensuite n'en réutilisent pas un.
+        """
+        type_codes = np.asarray(type_codes, dtype=np.intp)
+        if ids is None:
+            ids = Cell._global_counter + 1 + np.arange(len(type_codes))
+            Cell._global_counter += len(type_codes)
+        elif len(ids):
+            Cell._global_counter = max(Cell._global_counter, int(np.max(ids)))
+        return cls(positions, type_codes, ids, cell_types, **kwargs)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dim(self):
+        return self.positions.shape[1]
+
+    def track_history(self, length=None, stride=1, idx=None):
+        """
+        (Ré)initialise l'historique des positions. Seules les cellules
+        suivies y ont une ligne : idx (aucune par défaut) dès maintenant,
+        les autres à leur premier enregistrement.
+
+        length : None (historique complet) ou nombre d'échantillons gardés
+                 par cellule (tampon circulaire)
+        stride : on ne garde qu'un enregistrement sur stride
+        """
+        self._history_options = (length, stride)
+        self.history = PositionHistory(len(self), self.positions.shape[1], capacity=length, stride=stride)
+        if idx is not None:
+            self.history.track(self.positions, idx)
+        return self.history
+
+    def _history(self):
+        if self.history is None:
+            self.track_history(*self._history_options)
+        return self.history
+
+    def track_cells(self, idx):
+        """
+        Commence l'historique des cellules idx à leur position courante
+        (à appeler avant de les déplacer) ; sans effet pour celles déjà suivies.
+        """
+        self._history().track(self.positions, idx)
+
+    def record_history(self, idx=None):
+        """Enregistre la position courante des cellules idx (toutes par défaut)."""
+        self._history().record(self.positions, idx)
+
+    def history_of(self, idx):
+        """
+        Positions successives de la cellule idx : np.array (k, d) ; une
+        cellule non suivie n'a que sa position courante.
+        """
+        samples = self.history.get(idx) if self.history is not None else ()
+        return samples if len(samples) else self.positions[idx][None].copy()
+
+    def _attach(self, cell, idx):
+        # Reprise de l'historique accumulé par une cellule isolée
+        past = getattr(cell, "_history", None)
+        if past and len(past) > 1:
+            self._history().set(idx, past)
+        cell._population = self
+        cell._index = idx
+        cell._history = None
+        self._cells[idx] = cell
+
+    def cell(self, idx):
+        """Vue Cell sur la cellule idx, créée à la première demande."""
+        cell = self._cells[idx]
+        if cell is None:
+            cls = self.cell_types[self.type_codes[idx]]
+            cell = cls.__new__(cls)
+            cell._ids = int(self.ids[idx])
+            cell._global_id = int(self.ids[idx])
+            cell._cell_type = cls.CELL_TYPE
+            self._attach(cell, idx)
+        return cell
+
+    def cells(self):
+        return [self.cell(idx) for idx in range(len(self))]
+
+    def mask(self, cell_type):
+        """
+        Masque booléen des cellules de type cell_type (sous-classes comprises).
+        """
+        if cell_type not in self._masks:
+            codes = [code for code, cls in enumerate(self.cell_types) if issubclass(cls, cell_type)]
+            self._masks[cell_type] = np.isin(self.type_codes, codes)
+        return self._masks[cell_type]
+
+    def indices(self, cell_type):
+        return np.flatnonzero(self.mask(cell_type))
+
+    def __str__(self):
+        counts = {cls.CELL_TYPE: int(np.sum(self.type_codes == code)) for code, cls in enumerate(self.cell_types)}
+        return f"CellPopulation(n={len(self)}, dim={self.dim if len(self) else None}, types={counts})"
+
+    def __repr__(self):
+        return self.__str__()
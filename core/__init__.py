@@ -2,7 +2,15 @@ from .vertex import Vertex
 from .edge import Edge
 from .graph import Graph
 from .point import Point
+from .integrators import (BackwardEuler, CrankNicolson, IMEX)
+from .adaptive import (RK23, RK45)
+from .ensemble import Ensemble
+from .checkpoint import (save_checkpoint, load_checkpoint, Checkpointer)
 
 from .Cell.cell import (Cell, Neuron, Astrocyte, Microglia)
+from .Cell.population import CellPopulation
 
-from core.cellgraph import CellGraph
\ No newline at end of file
+from core.cellgraph import CellGraph
+from core.simulator import Simulator
+from core.reactions import (ReactionRegistry, default_reactions)
+from core.mobility import (Mobility, RandomWalk, Brownian, Chemotaxis, PersistentWalk)
\ No newline at end of file
@@ -0,0 +1,203 @@
+import numpy as np
+
+
+class AdaptiveResult:
+    """
+    Résultat d'une intégration adaptative.
+
+    t : np.array, instants de sortie
+    y : np.array (len(t), ...) solution à ces instants
+    n_steps, n_rejected, nfev : statistiques de pas
+    """
+
+    def __init__(self, t, y, n_steps, n_rejected, nfev, success=True, message=""):
+        self.t = t
+        self.y = y
+        self.n_steps = n_steps
+        self.n_rejected = n_rejected
+        self.nfev = nfev
+        self.success = success
+        self.message = message
+
+    def __str__(self):
+        return (f"AdaptiveResult(success={self.success}, n_steps={self.n_steps}, "
+                f"n_rejected={self.n_rejected}, nfev={self.nfev})")
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class EmbeddedRK:
+    """
+    Runge–Kutta explicite emboîté à pas adaptatif (propriété FSAL).
+
+    Le pas est contrôlé par l'estimation d'erreur locale
+        err = || (y_haut - y_bas) / (atol + rtol max(|y|, |y_new|)) ||_RMS
+    et la sortie dense aux instants demandés utilise l'interpolation
+    d'Hermite cubique sur chaque pas accepté.
+
+    Pour les problèmes raides (graphes très denses, D grand), préférer
+    les schémas IMEX de core.integrators.
+    """
+    A = None
+    B = None
+    C = None
+    E = None
+    order = None
+    error_order = None
+
+    SAFETY = 0.9
+    MIN_FACTOR = 0.2
+    MAX_FACTOR = 10.0
+
+    def __init__(self, rtol=1e-3, atol=1e-6, max_step=np.inf, first_step=None, max_steps=100000):
+        self.rtol = rtol
+        self.atol = atol
+        self.max_step = max_step
+        self.first_step = first_step
+        self.max_steps = max_steps
+
+    def _error_norm(self, err, y, y_new):
+        scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+        return np.sqrt(np.mean((err / scale) ** 2))
+
+    def _initial_step(self, f, t0, y0, f0, direction):
+        # Heuristique de Hairer, Nørsett & Wanner (II.4)
+        scale = self.atol + self.rtol * np.abs(y0)
+        d0 = np.sqrt(np.mean((y0 / scale) ** 2))
+        d1 = np.sqrt(np.mean((f0 / scale) ** 2))
+        h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+
+        f1 = f(t0 + direction * h0, y0 + direction * h0 * f0)
+        d2 = np.sqrt(np.mean(((f1 - f0) / scale) ** 2)) / h0
+        if max(d1, d2) <= 1e-15:
+            h1 = max(1e-6, h0 * 1e-3)
+        else:
+            h1 = (0.01 / max(d1, d2)) ** (1.0 / (self.order + 1))
+        return min(100 * h0, h1, self.max_step)
+
+    def _rk_step(self, f, t, y, f0, h):
+        K = [f0]
+        for s in range(1, len(self.C)):
+            dy = sum(a * k for a, k in zip(self.A[s], K) if a != 0.0)
+            K.append(f(t + self.C[s] * h, y + h * dy))
+        y_new = y + h * sum(b * k for b, k in zip(self.B, K) if b != 0.0)
+        f_new = f(t + h, y_new)
+        K.append(f_new)
+        err = h * sum(e * k for e, k in zip(self.E, K) if e != 0.0)
+        return y_new, f_new, err
+
+    def solve(self, f, t_span, y0, t_eval=None):
+        """
+        Intègre dy/dt = f(t, y) sur t_span = (t0, tf).
+
+        y0 : np.array de forme (n,) ou (n, B)
+        t_eval : instants de sortie (par défaut : tous les pas acceptés)
+        """
+        t0, tf = float(t_span[0]), float(t_span[1])
+        direction = 1.0 if tf >= t0 else -1.0
+        y = np.array(y0, dtype=float)
+
+        if t_eval is not None:
+            t_eval = np.asarray(t_eval, dtype=float)
+            out = np.empty((len(t_eval),) + y.shape)
+            i_eval = 0
+            # Instants confondus avec t0
+            while i_eval < len(t_eval) and direction * (t_eval[i_eval] - t0) <= 0:
+                out[i_eval] = y
+                i_eval += 1
+        else:
+            ts, ys = [t0], [y.copy()]
+
+        f0 = f(t0, y)
+        nfev = 1
+        if self.first_step is None:
+            h = self._initial_step(f, t0, y, f0, direction)
+            nfev += 1
+        else:
+            h = self.first_step
+
+        t = t0
+        n_steps = 0
+        n_rejected = 0
+        exponent = -1.0 / (self.error_order + 1)
+        success, message = True, "Intégration terminée."
+
+        while direction * (tf - t) > 0:
+            if n_steps + n_rejected >= self.max_steps:
+                success, message = False, "Nombre maximal de pas atteint."
+                break
+
+            h = min(h, self.max_step, abs(tf - t))
+            y_new, f_new, err = self._rk_step(f, t, y, f0, direction * h)
+            nfev += len(self.C)
+            err_norm = self._error_norm(err, y, y_new)
+
+            if err_norm > 1.0:
+                # Pas rejeté : on réduit h et on recommence
+                h *= max(self.MIN_FACTOR, self.SAFETY * err_norm ** exponent)
+                n_rejected += 1
+                if h < 10 * np.finfo(float).eps * abs(t):
+                    success, message = False, "Pas de temps trop petit."
+                    break
+                continue
+
+            t_new = t + direction * h
+            n_steps += 1
+
+            if t_eval is not None:
+                # Sortie dense : Hermite cubique sur [t, t_new]
+                while i_eval < len(t_eval) and direction * (t_eval[i_eval] - t_new) <= 0:
+                    out[i_eval] = self._hermite(t, y, f0, t_new, y_new, f_new, t_eval[i_eval])
+                    i_eval += 1
+            else:
+                ts.append(t_new)
+                ys.append(y_new.copy())
+
+            factor = self.MAX_FACTOR if err_norm == 0 else min(self.MAX_FACTOR, self.SAFETY * err_norm ** exponent)
+            h *= max(self.MIN_FACTOR, factor)
+            t, y, f0 = t_new, y_new, f_new
+
+        if t_eval is None:
+            t_out, y_out = np.array(ts), np.array(ys)
+        else:
+            t_out, y_out = t_eval[:i_eval], out[:i_eval]
+        return AdaptiveResult(t_out, y_out, n_steps, n_rejected, nfev, success, message)
+
+    @staticmethod
+    def _hermite(t0, y0, f0, t1, y1, f1, t):
+        h = t1 - t0
+        s = (t - t0) / h
+        h00 = (1 + 2 * s) * (1 - s) ** 2
+        h10 = s * (1 - s) ** 2
+        h01 = s ** 2 * (3 - 2 * s)
+        h11 = s ** 2 * (s - 1)
+        return h00 * y0 + h10 * h * f0 + h01 * y1 + h11 * h * f1
+
+
+class RK23(EmbeddedRK):
+    """Bogacki–Shampine 3(2)."""
+    order = 3
+    error_order = 2
+    C = np.array([0, 1 / 2, 3 / 4])
+    A = [[],
+         [1 / 2],
+         [0, 3 / 4]]
+    B = np.array([2 / 9, 1 / 3, 4 / 9])
+    # Différence entre les solutions d'ordre 3 et 2 (coefficients sur K1..K4)
+    E = np.array([5 / 72, -1 / 12, -1 / 9, 1 / 8])
+
+
+class RK45(EmbeddedRK):
+    """Dormand–Prince 5(4)."""
+    order = 5
+    error_order = 4
+    C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+    A = [[],
+         [1 / 5],
+         [3 / 40, 9 / 40],
+         [44 / 45, -56 / 15, 32 / 9],
+         [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+         [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]]
+    B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+    E = np.array([-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
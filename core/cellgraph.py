@@ -1,52 +1,151 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
+from scipy.spatial import cKDTree
 from .vertex import Vertex
-from .edge import Edge
 from .graph import Graph
 from .Cell.cell import Neuron, Astrocyte, Microglia
+from .Cell.population import CellPopulation
+from .mobility import Mobility
+from .profiling import profiled
+from .render import CellGraphRenderer
 
 class CellGraph:
-    def __init__(self, cells: list, connect_rule="linear"):
+    # Règles dont la topologie ne dépend pas des positions
+    POSITION_FREE_RULES = ("linear", "fully_connected")
+
+    def __init__(self, cells: list, connect_rule="linear", sparse=False, radius=None, k=None, skin=None,
+                 mobility=None):
         """
         cells : liste d'objets Cell (Neuron, Astrocyte, Microglia)
-        connect_rule : str, règle de connexion ("linear", "fully_connected", etc.)
+        connect_rule : str, règle de connexion ("linear", "fully_connected",
+                       "radius", "knn")
+        sparse : bool, matrices du graphe au format scipy.sparse CSR
+        radius : float, rayon de connexion pour la règle "radius"
+        k : int, nombre de plus proches voisins pour la règle "knn"
+        skin : float, marge des listes de voisins de Verlet pour la règle
+               "radius" (None : requête KD-tree à chaque mise à jour)
+        mobility : Mobility, déplacement des cellules mobiles (par défaut
+                   marche aléatoire des Microglia, générateur non graine)
         """
-        self.cells = cells
-        self.vertices = [Vertex(ids=cell._global_id, value=0.0) for cell in cells]
-        self.edges = self._create_edges(connect_rule)
-        self.graph = Graph(vertices=self.vertices, edges=self.edges)
-        #self.positions = {v._ids: (np.random.rand(), np.random.rand()) for v in self.vertices}
-        self.positions = {v._ids: (cells[idx].pos[0], cells[idx].pos[1]) for idx, v in enumerate(self.vertices)}
+        self._cells = cells
+        # Positions et types stockés en tableaux ; les cellules en sont des vues
+        self.population = CellPopulation.from_cells(cells)
+        self.sparse = sparse
+        self.mobility = mobility if mobility is not None else Mobility()
+        self.radius = radius
+        self.k = k
+        self.skin = skin
+        self.connect_rule = connect_rule
+        vertices = [Vertex(ids=cell._global_id, value=0.0) for cell in cells]
+        self.graph = Graph(vertices=vertices, edges=[], sparse=sparse)
+        self._set_edges(connect_rule)
+        self._init_state()
+
+    def _init_state(self):
+        # Cellules déplacées depuis la dernière mise à jour du graphe
+        self._moved = np.empty(0, dtype=np.intp)
+        self._static_index = None
+
+        # Listes de Verlet (cf. _verlet_static_pairs)
+        self._verlet = None
+        self.n_neighbour_updates = 0
+        self.n_neighbour_rebuilds = 0
+
+    def save(self, path):
+        """Ecrit le graphe de cellules dans le répertoire path (cf. graphio.save_cellgraph)."""
+        from .graphio import save_cellgraph
+        save_cellgraph(self, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None, mobility=None):
+        """Relit un graphe de cellules écrit par save (cf. graphio.load_cellgraph)."""
+        from .graphio import load_cellgraph
+        return load_cellgraph(path, mmap_mode=mmap_mode, mobility=mobility)
 
+    @property
+    def cells(self):
+        """Objets Cell (vues sur la population), créés à la première demande."""
+        if self._cells is None:
+            self._cells = self.population.cells()
+        return self._cells
 
-    def _create_edges(self, rule):
-        edges = []
+    @property
+    def vertices(self):
+        return self.graph.get_vertices()
+
+    @property
+    def edges(self):
+        return self.graph.get_edges()
+
+    @property
+    def positions(self):
+        """Dictionnaire {id du sommet : (x, y)}."""
+        pos = self.population.positions
+        return {v._ids: (pos[idx, 0], pos[idx, 1]) for idx, v in enumerate(self.vertices)}
+
+    def get_position_array(self):
+        """Copie des positions des cellules sous forme d'un np.array (n, d)."""
+        return self.population.positions.copy()
+
+    def _create_edge_index(self, rule):
+        """
+        Paires (src, dst) d'indices de cellules à connecter, i < j.
+        """
+        n = len(self.population)
         if rule == "linear":
             # Connecte chaque cellule à sa voisine
-            for i in range(len(self.vertices) - 1):
-                edges.append(Edge(extremity=[self.vertices[i], self.vertices[i+1]], coeff=1.0))
+            src = np.arange(n - 1)
+            return src, src + 1
         elif rule == "fully_connected":
             # Graphe complet
-            for i in range(len(self.vertices)):
-                for j in range(i+1, len(self.vertices)):
-                    edges.append(Edge(extremity=[self.vertices[i], self.vertices[j]], coeff=1.0))
+            return np.triu_indices(n, k=1)
+        elif rule == "radius":
+            # Toutes les paires à distance <= radius (KD-tree)
+            if self.radius is None:
+                raise ValueError("connect_rule='radius' requires a radius.")
+            if n == 0:
+                return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+            tree = cKDTree(self.get_position_array())
+            pairs = tree.query_pairs(self.radius, output_type="ndarray")
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+            return pairs[:, 0], pairs[:, 1]
+        elif rule == "knn":
+            # Chaque cellule reliée à ses k plus proches voisins (symétrisé)
+            if self.k is None:
+                raise ValueError("connect_rule='knn' requires k.")
+            k = min(self.k, n - 1)
+            if k < 1:
+                return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+            tree = cKDTree(self.get_position_array())
+            _, nbrs = tree.query(self.get_position_array(), k=k + 1)
+            src = np.repeat(np.arange(n), k + 1)
+            dst = nbrs.ravel()
+            keep = src != dst
+            pairs = np.unique(np.sort(np.stack([src[keep], dst[keep]], axis=1), axis=1), axis=0)
+            return pairs[:, 0], pairs[:, 1]
         # Ajouter d'autres règles si nécessaire
-        return edges
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    def _set_edges(self, rule):
+        # Arêtes passées au graphe en tableaux : les Edge (coeff 1.0) ne
+        # sont créés que si get_edges() est appelé
+        src, dst = self._create_edge_index(rule)
+        self.graph.set_edge_array(src, dst, weights=np.ones(len(src)))
+
+    # Densité initiale par type de cellule
+    DEFAULT_DENSITY = ((Neuron, 1.0), (Astrocyte, 0.5), (Microglia, 0.2))
 
     def set_density(self, u_dict=None):
         """
         u_dict : dict {Cell : value} ou None pour initialiser selon le type
         """
-        u = np.zeros(len(self.vertices))
+        u = np.zeros(len(self.population))
         if u_dict is None:
             # initialisation par type
-            for idx, cell in enumerate(self.cells):
-                if isinstance(cell, Neuron):
-                    u[idx] = 1.0
-                elif isinstance(cell, Astrocyte):
-                    u[idx] = 0.5
-                elif isinstance(cell, Microglia):
-                    u[idx] = 0.2
+            for cell_type, value in self.DEFAULT_DENSITY:
+                u[self.population.mask(cell_type)] = value
         else:
             # initialisation personnalisée
             for idx, cell in enumerate(self.cells):
@@ -56,47 +155,163 @@ class CellGraph:
     def compute_divergence(self, u, c):
         return self.graph.get_div_matrix(u, c)
     
-    def update_graph(self, connect_rule="fully_connected"):
+    @profiled("CellGraph.update_graph")
+    def update_graph(self, connect_rule=None, moved=None):
         """
         Recalcule les arêtes du graphe selon les nouvelles positions.
+
+        connect_rule : None pour garder la règle courante ; une autre règle
+                       force une reconstruction complète
+        moved : indices des cellules déplacées (par défaut, celles déplacées
+                par update_positions depuis la dernière mise à jour)
+
+        La mise à jour est incrémentale : avec "linear" et "fully_connected"
+        la topologie ne dépend pas des positions, avec "radius" seules les
+        arêtes touchant les cellules déplacées sont recalculées. La règle
+        "knn" n'est pas locale et reconstruit tout le graphe.
         """
-        self.edges = self._create_edges(connect_rule)
-        self.graph = Graph(vertices=self.vertices, edges=self.edges)
-        
-        
-    def update_positions(self, dt=0.05, bounds=(0, 3)):
-        min_x, max_x = bounds
-        for idx, cell in enumerate(self.cells):
-            if isinstance(cell, Microglia):
-                dx, dy = np.random.randn(2) * dt
-                cell.pos[0] += dx
-                cell.pos[1] += dy
-    
-                # Rester dans les bornes définies
-                cell.pos[0] = np.clip(cell.pos[0], min_x, max_x)
-                cell.pos[1] = np.clip(cell.pos[1], min_x, max_x)
-    
-                self.positions[self.vertices[idx]._ids] = (cell.pos[0], cell.pos[1])
+        if moved is None:
+            moved = self._moved
+        self._moved = np.empty(0, dtype=np.intp)
+
+        if connect_rule is not None and connect_rule != self.connect_rule:
+            self.connect_rule = connect_rule
+            self._rebuild_graph()
+        elif self.connect_rule in self.POSITION_FREE_RULES:
+            return
+        elif self.connect_rule == "radius":
+            self._update_radius_edges(moved)
+        else:
+            self._rebuild_graph()
+
+    def _rebuild_graph(self):
+        self._set_edges(self.connect_rule)
+        self._static_index = None
+        self._verlet = None
+
+    def _update_radius_edges(self, moved):
+        moved = np.unique(np.asarray(moved, dtype=np.intp))
+        if len(moved) == 0:
+            return
+        n = len(self.population)
+
+        # KD-tree des cellules immobiles, conservé tant que l'ensemble des
+        # cellules déplacées reste le même
+        key = moved.tobytes()
+        if self._static_index is None or self._static_index[0] != key:
+            is_moved = np.zeros(n, dtype=bool)
+            is_moved[moved] = True
+            static = np.flatnonzero(~is_moved)
+            tree = cKDTree(self.get_position_array()[static]) if len(static) else None
+            self._static_index = (key, tree, static)
+        _, tree, static = self._static_index
+
+        P = self.population.positions[moved]
+        pairs_i, pairs_j = [], []
+        if tree is not None:
+            if self.skin:
+                pi, pj = self._verlet_static_pairs(key, moved, P, tree, static)
+            else:
+                nbrs = tree.query_ball_point(P, self.radius)
+                counts = np.fromiter(map(len, nbrs), dtype=np.intp, count=len(moved))
+                pi = np.repeat(moved, counts)
+                pj = static[np.concatenate(nbrs).astype(np.intp)] if counts.sum() else pi
+            pairs_i.append(pi)
+            pairs_j.append(pj)
+        # Paires entre cellules déplacées : peu nombreuses, recalculées à chaque pas
+        mm = cKDTree(P).query_pairs(self.radius, output_type="ndarray")
+        pairs_i.append(moved[mm[:, 0]])
+        pairs_j.append(moved[mm[:, 1]])
+        pi, pj = np.concatenate(pairs_i), np.concatenate(pairs_j)
+        new_keys = np.minimum(pi, pj) * n + np.maximum(pi, pj)
 
+        # Arêtes actuelles touchant une cellule déplacée : O(somme de leurs degrés)
+        touching = self.graph.get_incident_edges(moved)
+        src, dst = self.graph.get_edge_index()
+        old_keys = np.minimum(src[touching], dst[touching]) * n + np.maximum(src[touching], dst[touching])
 
-    def plot(self):
-        # Tracer les arêtes
-        for edge in self.edges:
-            x = [self.positions[edge._extremity[0]._ids][0], self.positions[edge._extremity[1]._ids][0]]
-            y = [self.positions[edge._extremity[0]._ids][1], self.positions[edge._extremity[1]._ids][1]]
-            plt.plot(x, y, 'k-', alpha=0.5)
+        removed = touching[~np.isin(old_keys, new_keys)]
+        added = np.setdiff1d(new_keys, old_keys)
+        self.graph.update_edges(removed, (added // n, added % n))
 
-        # Tracer les sommets avec couleur selon type
-        for idx, cell in enumerate(self.cells):
-            pos = self.positions[self.vertices[idx]._ids]
-            if isinstance(cell, Neuron):
-                plt.scatter(pos[0], pos[1], c='red', s=100, label='Neuron' if idx == 0 else "")
-            elif isinstance(cell, Astrocyte):
-                plt.scatter(pos[0], pos[1], c='blue', s=100, label='Astrocyte' if idx == 0 else "")
-            elif isinstance(cell, Microglia):
-                plt.scatter(pos[0], pos[1], c='green', s=100, label='Microglia' if idx == 0 else "")
+    def _verlet_static_pairs(self, key, moved, P, tree, static):
+        """
+        Voisins immobiles des cellules déplacées via des listes de Verlet.
+
+        Chaque cellule déplacée garde la liste des cellules immobiles à
+        distance <= radius + skin de sa position de référence ; la liste
+        n'est recalculée que lorsque la cellule s'est éloignée de plus de
+        skin / 2 de cette référence. Entre deux reconstructions, on filtre
+        simplement les candidats à distance <= radius.
+        """
+        verlet = self._verlet
+        if verlet is None or verlet["key"] != key:
+            verlet = {"key": key,
+                      "ref": np.full(P.shape, np.inf),
+                      "cand": [np.empty(0, dtype=np.intp)] * len(moved)}
+            self._verlet = verlet
 
-        plt.legend()
-        plt.show()
+        ref, cand = verlet["ref"], verlet["cand"]
+        displacement = np.linalg.norm(P - ref, axis=1)
+        stale = np.flatnonzero(~(displacement <= 0.5 * self.skin))
+        if len(stale):
+            lists = tree.query_ball_point(P[stale], self.radius + self.skin)
+            for s, lst in zip(stale.tolist(), lists):
+                cand[s] = np.asarray(lst, dtype=np.intp)
+            ref[stale] = P[stale]
+            self.n_neighbour_rebuilds += len(stale)
+        self.n_neighbour_updates += 1
 
+        counts = np.fromiter(map(len, cand), dtype=np.intp, count=len(cand))
+        if not counts.sum():
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        rows = np.repeat(np.arange(len(moved)), counts)
+        cols = np.concatenate(cand)
+        keep = np.linalg.norm(P[rows] - tree.data[cols], axis=1) <= self.radius
+        return moved[rows[keep]], static[cols[keep]]
+
+    def neighbour_list_stats(self):
+        """
+        Statistiques des listes de Verlet : nombre de mises à jour, nombre
+        de listes reconstruites et taux de reconstruction par cellule et par pas.
+        """
+        n_cells = len(self._verlet["cand"]) if self._verlet is not None else 0
+        updates = self.n_neighbour_updates
+        rate = self.n_neighbour_rebuilds / (updates * n_cells) if updates and n_cells else 0.0
+        return {"updates": updates, "rebuilds": self.n_neighbour_rebuilds, "rebuild_rate": rate}
+
+    @profiled("CellGraph.update_positions")
+    def update_positions(self, dt=0.05, bounds=(0, 3), c=None):
+        """
+        Déplace les cellules mobiles via self.mobility (cf. core.mobility).
+        c : champ attractif, requis par le modèle Chemotaxis
+        """
+        moved = self.mobility.step(self.population, dt, bounds=bounds, graph=self.graph, c=c)
+        self._moved = np.union1d(self._moved, moved)
+
+
+    # Couleur de tracé par type de cellule
+    PLOT_COLORS = ((Neuron, 'red'), (Astrocyte, 'blue'), (Microglia, 'green'))
+
+    def plot(self, ax=None, show=True):
+        """
+        Dessine le graphe (arêtes en une LineCollection, cellules en une
+        PathCollection colorées par type) ; renvoie le CellGraphRenderer.
+        """
+        ax = plt.gca() if ax is None else ax
+        pos = self.population.positions
+        colors = np.zeros((len(pos), 4))
+        handles = []
+        for cell_type, color in self.PLOT_COLORS:
+            mask = self.population.mask(cell_type)
+            if mask.any():
+                colors[mask] = to_rgba(color)
+                handles.append(Line2D([], [], marker='o', linestyle='', color=color, markersize=10,
+                                      label=cell_type.CELL_TYPE))
 
+        renderer = CellGraphRenderer(ax, pos, edges=self.graph.get_edge_index(), colors=colors,
+                                     edge_color='k', edge_alpha=0.5)
+        ax.legend(handles=handles)
+        if show:
+            plt.show()
+        return renderer
@@ -0,0 +1,191 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .Cell.cell import Cell
+
+
+''' Points de reprise des simulations (fichier .npz unique, écriture atomique) '''
+
+FORMAT_VERSION = 1
+
+
+def _cell_classes(cls=Cell):
+    """Cell et toutes ses sous-classes, indexées par nom qualifié."""
+    classes = {f"{cls.__module__}.{cls.__qualname__}": cls}
+    for sub in cls.__subclasses__():
+        classes.update(_cell_classes(sub))
+    return classes
+
+
+def _counters():
+    counters = {name: cls.__dict__["_counter"] for name, cls in _cell_classes().items() if "_counter" in cls.__dict__}
+    counters["__global__"] = Cell._global_counter
+    return counters
+
+
+def save_checkpoint(path, arrays=None, state=None, cellgraph=None, rngs=None, global_rng=True):
+    """
+    Ecrit un point de reprise dans path (format .npz).
+
+    arrays : dict {nom : np.array}, densités et autres champs (u, c, ...)
+    state : dict JSON (t, step, dt, paramètres de l'intégrateur, ...)
+    cellgraph : CellGraph dont on sauve positions, types, identifiants,
+                arêtes (dans leur ordre) et état du modèle de mobilité
+    rngs : dict {nom : np.random.Generator} à sauvegarder
+    global_rng : sauve aussi l'état du générateur global np.random
+
+    Le fichier est d'abord écrit à côté de path puis renommé : un arrêt
+    brutal ne laisse jamais un point de reprise partiel.
+    """
+    payload = {f"array/{name}": np.asarray(value) for name, value in (arrays or {}).items()}
+    meta = {"version": FORMAT_VERSION,
+            "state": state or {},
+            "counters": _counters(),
+            "rngs": {name: rng.bit_generator.state for name, rng in (rngs or {}).items()},
+            "cellgraph": None,
+            "global_rng": None}
+
+    if global_rng:
+        name, keys, pos, has_gauss, cached = np.random.get_state()
+        payload["global_rng/keys"] = keys
+        meta["global_rng"] = [name, int(pos), int(has_gauss), float(cached)]
+
+    if cellgraph is not None:
+        population = cellgraph.population
+        src, dst = cellgraph.graph.get_edge_index()
+        payload["cellgraph/positions"] = population.positions
+        payload["cellgraph/type_codes"] = population.type_codes
+        payload["cellgraph/ids"] = population.ids
+        payload["cellgraph/src"] = src
+        payload["cellgraph/dst"] = dst
+        payload["cellgraph/moved"] = cellgraph._moved
+        model = cellgraph.mobility.model
+        if getattr(model, "velocity", None) is not None:
+            payload["cellgraph/velocity"] = model.velocity
+        meta["cellgraph"] = {"connect_rule": cellgraph.connect_rule,
+                             "cell_types": [f"{cls.__module__}.{cls.__qualname__}" for cls in population.cell_types],
+                             "mobility_rng": cellgraph.mobility.rng.bit_generator.state}
+
+    payload["__meta__"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".checkpoint_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **payload)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crée le fichier en 0600 : on revient aux droits usuels
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class Checkpoint:
+    """
+    Point de reprise relu par load_checkpoint.
+
+    arrays : dict {nom : np.array}
+    state : dict sauvegardé tel quel
+    """
+
+    def __init__(self, meta, data):
+        self.meta = meta
+        self._data = data
+        self.arrays = {key[len("array/"):]: value for key, value in data.items() if key.startswith("array/")}
+        self.state = meta["state"]
+
+    def restore_counters(self):
+        """Restaure Cell._global_counter et les compteurs par sous-classe."""
+        classes = _cell_classes()
+        for name, value in self.meta["counters"].items():
+            if name == "__global__":
+                Cell._global_counter = value
+            elif name in classes:
+                classes[name]._counter = value
+
+    def restore_rng(self, name, rng):
+        """Remet le générateur rng dans l'état sauvegardé sous name."""
+        rng.bit_generator.state = self.meta["rngs"][name]
+        return rng
+
+    def restore_global_rng(self):
+        if self.meta["global_rng"] is not None:
+            name, pos, has_gauss, cached = self.meta["global_rng"]
+            np.random.set_state((name, self._data["global_rng/keys"], pos, has_gauss, cached))
+
+    def restore_cellgraph(self, cellgraph):
+        """
+        Restaure positions, arêtes (dans le même ordre) et état de mobilité
+        dans un CellGraph construit sur les mêmes cellules.
+        """
+        info = self.meta["cellgraph"]
+        if info is None:
+            raise ValueError("This checkpoint does not contain a CellGraph.")
+        population = cellgraph.population
+        if (not np.array_equal(population.ids, self._data["cellgraph/ids"])
+                or not np.array_equal(population.type_codes, self._data["cellgraph/type_codes"])):
+            raise ValueError("CellGraph cells do not match the checkpoint.")
+
+        population.positions[...] = self._data["cellgraph/positions"]
+
+        src, dst = self._data["cellgraph/src"], self._data["cellgraph/dst"]
+        cellgraph.connect_rule = info["connect_rule"]
+        cellgraph.graph.set_edge_array(src, dst, weights=np.ones(len(src)))
+        cellgraph._moved = self._data["cellgraph/moved"].astype(np.intp)
+        cellgraph._static_index = None
+        cellgraph._verlet = None
+
+        cellgraph.mobility.rng.bit_generator.state = info["mobility_rng"]
+        if "cellgraph/velocity" in self._data:
+            cellgraph.mobility.model.velocity = self._data["cellgraph/velocity"].copy()
+        return cellgraph
+
+    def restore(self, cellgraph=None, rngs=None):
+        """Restaure compteurs, générateur global, CellGraph et générateurs nommés."""
+        self.restore_counters()
+        self.restore_global_rng()
+        if cellgraph is not None:
+            self.restore_cellgraph(cellgraph)
+        for name, rng in (rngs or {}).items():
+            self.restore_rng(name, rng)
+
+
+def load_checkpoint(path):
+    with np.load(path) as f:
+        data = {key: f[key] for key in f.files}
+    meta = json.loads(data.pop("__meta__").tobytes().decode())
+    if meta["version"] > FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format version {meta['version']}.")
+    return Checkpoint(meta, data)
+
+
+class Checkpointer:
+    """
+    Sauvegarde périodique : maybe_save(step, ...) écrit un point de reprise
+    tous les every pas (mêmes arguments que save_checkpoint).
+    """
+
+    def __init__(self, path, every=1000):
+        self.path = path
+        self.every = every
+
+    def maybe_save(self, step, **kwargs):
+        if (step + 1) % self.every == 0:
+            save_checkpoint(self.path, **kwargs)
+            return True
+        return False
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        return load_checkpoint(self.path)
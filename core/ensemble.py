@@ -0,0 +1,109 @@
+import numpy as np
+
+
+class EnsembleResult:
+    """
+    Résultat d'une simulation d'ensemble à B membres.
+
+    u : np.array (n, B), états finaux
+    t : np.array (n_steps,), instants des diagnostics
+    mass : np.array (n_steps, B), masse totale sum(u) par membre
+    lap_norm : np.array (n_steps, B), ||L u|| par membre
+    states : np.array (n_saved, n, B) ou None, états stockés
+    """
+
+    def __init__(self, u, t, mass, lap_norm, states=None):
+        self.u = u
+        self.t = t
+        self.mass = mass
+        self.lap_norm = lap_norm
+        self.states = states
+
+    def __str__(self):
+        n, B = self.u.shape
+        return f"EnsembleResult(n={n}, members={B}, steps={len(self.t)})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class Ensemble:
+    """
+    Ensemble de B simulations Keller–Segel sur un même graphe
+
+        du/dt = -dk L u + div(u, c) + reaction(u)
+
+    avancées ensemble : l'état est un tableau (n, B) et chaque pas ne
+    fait qu'un produit L @ U (creux ou BLAS) et un appel vectorisé à
+    get_div_matrix pour tous les membres.
+
+    graph : Graph
+    u0 : np.array (n,) commun ou (n, B) par membre
+    c : None, np.array (n,) commun ou (n, B) par membre
+    diffusion : float commun ou np.array (B,) par membre
+    normalized : bool, utilise le laplacien normalisé
+    reaction : callable reaction(u) -> np.array, u de forme (n, B)
+    n_members : B, requis si aucun paramètre ne le fixe
+    """
+
+    def __init__(self, graph, u0, c=None, diffusion=1.0, normalized=False, reaction=None, n_members=None):
+        self.graph = graph
+        self.normalized = normalized
+        self.reaction = reaction
+
+        u0 = np.asarray(u0, dtype=float)
+        c = None if c is None else np.asarray(c, dtype=float)
+        diffusion = np.asarray(diffusion, dtype=float)
+
+        sizes = {n_members} if n_members is not None else set()
+        if u0.ndim == 2:
+            sizes.add(u0.shape[1])
+        if c is not None and c.ndim == 2:
+            sizes.add(c.shape[1])
+        if diffusion.ndim == 1:
+            sizes.add(len(diffusion))
+        if len(sizes) > 1:
+            raise ValueError(f"Inconsistent ensemble sizes: {sorted(sizes)}")
+        B = sizes.pop() if sizes else 1
+
+        n = graph.order
+        self.u0 = np.array(np.broadcast_to(u0.reshape(n, -1), (n, B)))
+        self.c = c
+        # Diffusion par membre, diffusée sur les lignes
+        self.diffusion = np.broadcast_to(diffusion, (B,))[None, :]
+
+    @property
+    def n_members(self):
+        return self.u0.shape[1]
+
+    def run(self, dt, n_steps, store_every=0):
+        """
+        Euler explicite sur n_steps pas de temps.
+        store_every : stocke l'état tous les store_every pas (0 : jamais)
+        """
+        L = self.graph.get_normal_laplacian_matrix() if self.normalized else self.graph.get_laplacian_matrix()
+        B = self.n_members
+
+        U = self.u0.copy()
+        mass = np.empty((n_steps, B))
+        lap_norm = np.empty((n_steps, B))
+        states = [] if store_every else None
+
+        LU = L @ U
+        for step in range(n_steps):
+            du = -self.diffusion * LU
+            if self.c is not None:
+                du += self.graph.get_div_matrix(U, self.c)
+            if self.reaction is not None:
+                du += self.reaction(U)
+            U += dt * du
+
+            # Diagnostics par membre (L @ U resservira au pas suivant)
+            LU = L @ U
+            mass[step] = U.sum(axis=0)
+            lap_norm[step] = np.linalg.norm(LU, axis=0)
+            if store_every and (step + 1) % store_every == 0:
+                states.append(U.copy())
+
+        t = dt * np.arange(1, n_steps + 1)
+        return EnsembleResult(U, t, mass, lap_norm, None if states is None else np.array(states))
@@ -0,0 +1,170 @@
+import argparse
+import multiprocessing
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .trajectory import TrajectoryReader
+from .render import CellGraphRenderer, BarRenderer, trajectory_max, trajectory_limits, _fields
+
+
+''' Export d'une trajectoire en images PNG numérotées (Agg, sans affichage) et en vidéo '''
+
+RENDERERS = {"cells": CellGraphRenderer, "bars": BarRenderer}
+
+FRAME_PATTERN = "frame_{:06d}.png"
+
+
+def select_frames(n_frames, every=1, start=0, stop=None):
+    """Indices des échantillons exportés : un sur every entre start et stop."""
+    if every < 1:
+        raise ValueError(f"every must be >= 1, got {every}")
+    return list(range(n_frames))[start:stop:every]
+
+
+def available_cpus():
+    """Nombre de processeurs utilisables par le processus (affinité comprise)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _render_chunk(trajectory, jobs, output_dir, kind, figsize, dpi, limits, edges, kwargs):
+    # Une figure par processus, réutilisée pour toutes les images du bloc
+    if isinstance(trajectory, str):
+        trajectory = TrajectoryReader(trajectory)
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    renderer = RENDERERS[kind].from_trajectory(ax, trajectory, jobs[0][1], edges=edges, **kwargs)
+    if limits is not None:
+        ax.set_xlim(*limits[0])
+        ax.set_ylim(*limits[1])
+
+    paths = []
+    for index, frame in jobs:
+        renderer.set_frame(trajectory, frame, edges=edges if callable(edges) else None)
+        path = os.path.join(output_dir, FRAME_PATTERN.format(index))
+        fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    return paths
+
+
+def export_frames(trajectory, output_dir, kind="cells", every=1, start=0, stop=None, figsize=(6, 6), dpi=100,
+                  processes=None, chunk_size=None, limits=None, edges=None, label="t = {t:g}", **kwargs):
+    """
+    Rend les échantillons d'une trajectoire en images frame_000000.png,
+    frame_000001.png, ... (numérotation continue après décimation) dans
+    output_dir, avec le moteur Agg : aucun affichage n'est requis.
+
+    trajectory : TrajectoryReader, chemin d'une trajectoire ou dict de
+                 tableaux (les processus relisent le répertoire projeté en
+                 mémoire ; un dict leur est copié)
+    kind : "cells" (CellGraphRenderer) ou "bars" (BarRenderer)
+    every, start, stop : décimation, cf. select_frames
+    figsize, dpi : résolution, figsize * dpi pixels
+    processes : nombre de processus (None : available_cpus(), 1 : rendu en série
+                dans le processus courant)
+    chunk_size : nombre d'images par tâche (par défaut ~4 tâches par processus)
+    limits : None ou ((xmin, xmax), (ymin, ymax)) pour "cells" ; par défaut,
+             calculées sur les positions des images exportées, identiques
+             pour tous les processus
+    edges : cf. CellGraphRenderer.set_frame (un callable doit pouvoir être
+            sérialisé par pickle, i.e. défini au niveau d'un module)
+    kwargs : options du renderer ; vmax est calculé sur les images
+             exportées s'il n'est pas fourni
+
+    Renvoie la liste ordonnée des fichiers écrits.
+    """
+    if kind not in RENDERERS:
+        raise ValueError(f"Unknown renderer kind: {kind!r}")
+    if isinstance(trajectory, str):
+        trajectory = TrajectoryReader(trajectory)
+    field = kwargs.get("value_field", "u") if kind == "bars" else kwargs.get("position_field", "positions")
+    frames = select_frames(len(trajectory[field]), every, start, stop)
+    if not frames:
+        raise ValueError("No frame to export.")
+
+    value_field = kwargs.get("value_field", "u")
+    if kwargs.get("vmax") is None and value_field in _fields(trajectory):
+        kwargs["vmax"] = trajectory_max(trajectory, value_field, frames)
+    kwargs["label"] = label
+    # Axes fixés une fois pour toutes : ils ne dépendent pas du découpage en blocs
+    position_field = kwargs.get("position_field", "positions")
+    if kind == "cells" and limits is None and position_field in _fields(trajectory):
+        limits = trajectory_limits(trajectory, position_field, frames)
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = list(enumerate(frames))
+    processes = available_cpus() if processes is None else processes
+    if processes == 1:
+        return _render_chunk(trajectory, jobs, output_dir, kind, figsize, dpi, limits, edges, kwargs)
+
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(jobs) // (4 * processes)))
+    source = trajectory.path if isinstance(trajectory, TrajectoryReader) else trajectory
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    # fork (POSIX) : les processus ne réimportent pas le script appelant,
+    # qui peut donc appeler export_frames hors d'un bloc __main__
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=min(processes, len(chunks)), mp_context=context) as pool:
+        futures = [pool.submit(_render_chunk, source, chunk, output_dir, kind, figsize, dpi, limits, edges, kwargs)
+                   for chunk in chunks]
+        return [path for future in futures for path in future.result()]
+
+
+def encode_video(frame_dir, output, fps=25, codec="libx264", ffmpeg=None):
+    """
+    Assemble les images frame_XXXXXX.png de frame_dir en une vidéo avec
+    ffmpeg (exécutable trouvé dans le PATH si ffmpeg est None).
+    """
+    ffmpeg = ffmpeg or shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg was not found in PATH; the PNG frames are left in place.")
+    pattern = os.path.join(frame_dir, FRAME_PATTERN.replace("{:06d}", "%06d"))
+    # Dimensions paires exigées par yuv420p
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps), "-i", pattern,
+                    "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-c:v", codec, "-pix_fmt", "yuv420p", output],
+                   check=True)
+    return output
+
+
+def export_video(trajectory, output, frame_dir=None, fps=25, keep_frames=True, **kwargs):
+    """
+    export_frames puis encode_video : les images sont écrites dans
+    frame_dir (par défaut <output sans extension>_frames).
+    """
+    frame_dir = frame_dir or os.path.splitext(output)[0] + "_frames"
+    paths = export_frames(trajectory, frame_dir, **kwargs)
+    encode_video(frame_dir, output, fps=fps)
+    if not keep_frames:
+        for path in paths:
+            os.remove(path)
+    return output
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Export d'une trajectoire en images PNG (et en vidéo).")
+    parser.add_argument("trajectory", help="répertoire écrit par TrajectoryWriter")
+    parser.add_argument("output_dir")
+    parser.add_argument("--kind", default="cells", choices=list(RENDERERS))
+    parser.add_argument("--every", type=int, default=1, help="une image sur every")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int, default=None)
+    parser.add_argument("--figsize", type=float, nargs=2, default=(6, 6))
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--video", default=None, help="fichier vidéo (ffmpeg requis)")
+    parser.add_argument("--fps", type=int, default=25)
+    args = parser.parse_args()
+
+    paths = export_frames(args.trajectory, args.output_dir, kind=args.kind, every=args.every, start=args.start,
+                          stop=args.stop, figsize=tuple(args.figsize), dpi=args.dpi, processes=args.processes)
+    print(f"{len(paths)} images écrites dans {args.output_dir}")
+    if args.video:
+        print(f"Vidéo écrite dans {encode_video(args.output_dir, args.video, fps=args.fps)}")
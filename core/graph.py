@@ -1,28 +1,722 @@
 import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
 #import matplotlib.pyplot as plt
 
 from .edge import Edge
 from .vertex import Vertex
+from .profiling import PROFILER, profiled
+from . import kernels
+
+def keller_segel_divergence(src, dst, u, c, n, scatter=None):
+    """
+    Divergence Keller–Segel à partir des tableaux d'extrémités des arêtes
+    (cf. Graph.get_div_matrix).
+
+    scatter : kernels.edge_scatter_matrix(src, dst, n) précalculé, utilisé
+              pour des entrées (n, B)
+    """
+    u = np.asarray(u, dtype=float)
+    c = np.asarray(c, dtype=float)
+    if u.ndim < c.ndim:
+        u = u[:, None]
+    elif c.ndim < u.ndim:
+        c = c[:, None]
+
+    # Flux symétrique sur toutes les arêtes
+    f_edge = kernels.edge_flux(src, dst, u, c)
+
+    # Contribution à la divergence (un produit creux pour B états)
+    return kernels.scatter_flux(src, dst, f_edge, n, scatter)
+
+
+def _ragged_arange(counts):
+    """Concaténation des arange(c) pour c dans counts."""
+    offsets = np.cumsum(counts) - counts
+    return np.arange(int(np.sum(counts)), dtype=np.intp) - np.repeat(offsets, counts)
+
+
+class _EdgeSlots:
+    """
+    Structure de mise à jour incrémentale des arêtes (cf. Graph.update_edges).
+
+    src, dst, weights : tampons des extrémités et coefficients des arêtes,
+                        avec de la place libre en fin (m cases utilisées)
+    table : arêtes incidentes à chaque sommet, au format CSR avec de la
+            place libre dans chaque ligne : la ligne i occupe
+            [start[i], start[i + 1]) et ses count[i] premières cases
+            contiennent les numéros des arêtes incidentes (une boucle n'y
+            figure qu'une fois ; -1 : case libre)
+
+    L'adjacence et le laplacien creux en cache reprennent les lignes de la
+    table (une case de plus par ligne pour la diagonale du laplacien ; cases
+    libres : zéros explicites sur la diagonale), si bien qu'ajouter ou
+    retirer une arête ne réécrit que les lignes de ses extrémités. Une
+    ligne pleine prend la place libre de ses voisines (_make_room) ; la
+    table n'est reconstruite que lorsqu'elle est pleine dans son ensemble.
+    """
+
+    # Place libre minimale par ligne de la table
+    SLACK = 4
+
+    def __init__(self, src, dst, weights, n):
+        self.n = n
+        self.m = len(src)
+        capacity = self.m + max(16, self.m // 4)
+        self.src = np.empty(capacity, dtype=np.intp)
+        self.dst = np.empty(capacity, dtype=np.intp)
+        self.src[:self.m] = src
+        self.dst[:self.m] = dst
+        self.weights = None
+        if weights is not None:
+            self.weights = np.empty(capacity)
+            self.weights[:self.m] = weights
+        self.adjacency = None
+        self.laplacian = None
+        # Lignes déplacées par _make_room depuis la dernière remise à zéro
+        self.moved_rows = []
+        self.rebuild()
+
+    def views(self):
+        m = self.m
+        return self.src[:m], self.dst[:m], None if self.weights is None else self.weights[:m]
+
+    def rebuild(self):
+        """
+        (Re)construit la table, avec SLACK cases libres ou plus par ligne,
+        chaque ligne triée par colonne : O(m log m), un seul tri.
+        """
+        n, m = self.n, self.m
+        src, dst = self.src[:m], self.dst[:m]
+        nonloop = np.flatnonzero(src != dst)
+        rows = np.concatenate([src, dst[nonloop]])
+        cols = np.concatenate([dst, src[nonloop]])
+        edges = np.concatenate([np.arange(m, dtype=np.intp), nonloop])
+        count = np.bincount(rows, minlength=n).astype(np.intp)
+        start = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(count + np.maximum(self.SLACK, count // 2), out=start[1:])
+        table = np.full(start[n], -1, dtype=np.intp)
+        table[np.repeat(start[:-1], count) + _ragged_arange(count)] = edges[np.argsort(rows * n + cols)]
+        self.count, self.start, self.table = count, start, table
+        self.adjacency = self.laplacian = None
+
+    def _cells(self, rows):
+        """Cases occupées des lignes rows (distinctes) et ligne de chaque case."""
+        counts = self.count[rows]
+        return np.repeat(self.start[rows], counts) + _ragged_arange(counts), np.repeat(rows, counts)
+
+    def _find(self, rows, edges):
+        """Cases de la table contenant l'arête edges[i] dans la ligne rows[i]."""
+        cells, cell_rows = self._cells(np.unique(rows))
+        base = len(self.src)
+        keys = cell_rows * base + self.table[cells]
+        order = np.argsort(keys)
+        return cells[order[np.searchsorted(keys, rows * base + edges, sorter=order)]]
+
+    def _ends(self, edges):
+        # Couples (ligne, arête) : deux par arête, un seul pour une boucle
+        s, d = self.src[edges], self.dst[edges]
+        nonloop = s != d
+        return np.concatenate([s, d[nonloop]]), np.concatenate([edges, edges[nonloop]])
+
+    def incident(self, rows):
+        cells, _ = self._cells(rows)
+        return np.unique(self.table[cells])
+
+    def remove(self, edges):
+        """Retire les arêtes edges de la table en compactant les lignes touchées."""
+        rows, edge_ids = self._ends(edges)
+        self.table[self._find(rows, edge_ids)] = -1
+        rows = np.unique(rows)
+        cells, cell_rows = self._cells(rows)
+        keep = self.table[cells] >= 0
+        kept = np.bincount(np.searchsorted(rows, cell_rows[keep]), minlength=len(rows))
+        self.table[np.repeat(self.start[rows], kept) + _ragged_arange(kept)] = self.table[cells[keep]]
+        n_freed = self.count[rows] - kept
+        self.table[np.repeat(self.start[rows] + kept, n_freed) + _ragged_arange(n_freed)] = -1
+        self.count[rows] = kept
+
+    def relocate(self, sources, targets):
+        """Déplace les arêtes sources vers les numéros targets (trous laissés par remove)."""
+        if not len(sources):
+            return
+        rows, edge_ids = self._ends(sources)
+        cells = self._find(rows, edge_ids)
+        self.src[targets] = self.src[sources]
+        self.dst[targets] = self.dst[sources]
+        if self.weights is not None:
+            self.weights[targets] = self.weights[sources]
+        self.table[cells] = np.concatenate([targets, targets[self.src[targets] != self.dst[targets]]])
+
+    def append(self, a_s, a_d, a_w):
+        """
+        Ajoute les arêtes (a_s, a_d) de coefficients a_w en fin de tableaux
+        et dans les lignes de leurs extrémités. Une ligne pleine emprunte
+        la place libre de ses voisines (cf. _make_room). Renvoie False si
+        toute la table manque de place (elle est alors à reconstruire, les
+        tableaux d'arêtes sont à jour).
+        """
+        m, k = self.m, len(a_s)
+        if m + k > len(self.src):
+            capacity = 2 * (m + k)
+            for name in ("src", "dst", "weights"):
+                old = getattr(self, name)
+                if old is not None:
+                    buf = np.empty(capacity, dtype=old.dtype)
+                    buf[:m] = old[:m]
+                    setattr(self, name, buf)
+        if self.weights is None and np.any(a_w != 1.0):
+            self.weights = np.ones(len(self.src))
+        edges = np.arange(m, m + k, dtype=np.intp)
+        self.src[edges] = a_s
+        self.dst[edges] = a_d
+        if self.weights is not None:
+            self.weights[edges] = a_w
+        self.m = m + k
+
+        rows, edge_ids = self._ends(edges)
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        urows, first, n_new = np.unique(sorted_rows, return_index=True, return_counts=True)
+        full = self.count[urows] + n_new > self.start[urows + 1] - self.start[urows]
+        for row in urows[full].tolist():
+            if not self._make_room(row, urows, n_new):
+                return False
+        cells = self.start[sorted_rows] + self.count[sorted_rows] + np.arange(len(rows)) - np.repeat(first, n_new)
+        self.table[cells] = edge_ids[order]
+        self.count[urows] += n_new
+        return True
+
+    def _make_room(self, row, urows, n_new):
+        """
+        Agrandit la ligne row en redistribuant la place libre d'une plage
+        de lignes voisines [a, b] (doublée jusqu'à suffire) : seules ces
+        lignes de la table, de l'adjacence et du laplacien sont déplacées
+        et réécrites, en O(taille de la plage). La ligne row reçoit
+        max(SLACK, count // 2) cases libres de plus que nécessaire, le
+        reste de la place libre est réparti également.
+
+        urows, n_new : lignes (triées) et nombre d'arêtes qu'elles vont
+                       recevoir. Renvoie False si la table entière manque
+                       de place.
+        """
+        n = self.n
+        extra = max(self.SLACK, int(self.count[row]) // 2)
+        width = 1
+        while True:
+            a, b = max(row - width, 0), min(row + width, n - 1)
+            rows = np.arange(a, b + 1)
+            pos = np.minimum(np.searchsorted(urows, rows), len(urows) - 1)
+            needed = self.count[rows] + np.where(urows[pos] == rows, n_new[pos], 0)
+            spare = self.start[b + 1] - self.start[a] - int(needed.sum())
+            if spare >= 2 * extra:
+                break
+            if a == 0 and b == n - 1:
+                return False
+            width *= 2
+
+        PROFILER.count("Graph.update_edges/row_moves")
+        self.moved_rows.append(rows)
+        capacity = needed + (spare - extra) // len(rows)
+        capacity[row - a] += extra + (spare - extra) % len(rows)
+        cells, _ = self._cells(rows)
+        edges = self.table[cells]
+        self.table[self.start[a]:self.start[b + 1]] = -1
+        self.start[a + 1:b + 1] = self.start[a] + np.cumsum(capacity[:-1])
+        counts = self.count[rows]
+        self.table[np.repeat(self.start[rows], counts) + _ragged_arange(counts)] = edges
+
+        A, L = self.adjacency, self.laplacian
+        if A is not None:
+            A.indptr[a + 1:b + 1] = self.start[a + 1:b + 1]
+            if L is not None:
+                L.indptr[a + 1:b + 1] = self.start[a + 1:b + 1] + rows[1:]
+            self.write_rows(A, L, rows)
+        return True
+
+    # ----- Matrices creuses partageant la disposition de la table -----
+
+    def owns(self, A, L):
+        """Vrai si A (et L s'il est en cache) sont les matrices de la table, intactes."""
+        size = len(self.table)
+        if A is not self.adjacency or len(A.indices) != size:
+            return False
+        return L is None or (L is self.laplacian and len(L.indices) == size + self.n)
+
+    def matrices(self, dtype, laplacian=True):
+        """
+        Adjacence et laplacien (ou None) dans la disposition de la table :
+        O(m) si les lignes sont triées par colonne (table reconstruite),
+        O(m log m) sinon, comme une conversion COO -> CSR.
+        """
+        n = self.n
+        rows = np.arange(n)
+        span = np.diff(self.start)
+        # Cases occupées : en tête de chaque ligne, donc groupées par ligne
+        cells = np.flatnonzero(self.table >= 0)
+        cell_rows = np.repeat(rows, self.count)
+        A = sp.csr_matrix((np.zeros(len(self.table), dtype=dtype), np.repeat(rows, span), self.start.copy()),
+                          shape=(n, n))
+        L = None
+        if laplacian:
+            L = sp.csr_matrix((np.zeros(len(self.table) + n, dtype=dtype), np.repeat(rows, span + 1),
+                               self.start + np.arange(n + 1)), shape=(n, n))
+        self._write_cells(A, L, rows, cells, cell_rows)
+        self.adjacency, self.laplacian = A, L
+        return A, L
+
+    def write_rows(self, A, L, rows):
+        """
+        Réécrit les lignes rows (distinctes, croissantes) de A et L depuis
+        la table : colonnes triées, puis zéros explicites sur la diagonale
+        dans les cases libres. Le produit L @ u somme ainsi les termes dans
+        le même ordre que pour une matrice CSR canonique, quel que soit
+        l'historique des mises à jour.
+        """
+        lo = self.start[rows]
+        span = self.start[rows + 1] - lo
+        pad = np.repeat(lo, span) + _ragged_arange(span)
+        A.indices[pad] = np.repeat(rows, span)
+        A.data[pad] = 0
+        if L is not None:
+            pad = np.repeat(lo + rows, span + 1) + _ragged_arange(span + 1)
+            L.indices[pad] = np.repeat(rows, span + 1)
+            L.data[pad] = 0
+        self._write_cells(A, L, rows, *self._cells(rows))
+
+    def _write_cells(self, A, L, rows, cells, cell_rows):
+        # Écrit les cases occupées des lignes rows, dont les cases libres
+        # sont déjà des zéros explicites sur la diagonale
+        edges = self.table[cells]
+        s = self.src[edges]
+        cols = np.where(s == cell_rows, self.dst[edges], s)
+        # cell_rows est croissant : le tri par (ligne, colonne) ne le change pas
+        key = cell_rows * self.n + cols
+        if np.any(key[1:] < key[:-1]):
+            cols = cols[np.argsort(key)]
+        A.indices[cells] = cols
+        A.data[cells] = 1
+        if L is None:
+            return
+
+        # Diagonale à sa place dans l'ordre des colonnes ; une boucle y est
+        # comptée (degré - 1) et sa propre case reste à zéro
+        counts = self.count[rows]
+        after = cols >= cell_rows
+        pos = cells + cell_rows + after
+        L.indices[pos] = cols
+        L.data[pos] = np.where(cols == cell_rows, 0, -1)
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            row_of = cell_rows - rows[0]
+        else:
+            row_of = np.repeat(np.arange(len(rows)), counts)
+        below = np.bincount(row_of[~after], minlength=len(rows))
+        loops = np.bincount(row_of[cols == cell_rows], minlength=len(rows))
+        L.data[self.start[rows] + rows + below] = counts - loops
+
 
 class Graph:
-    def __init__(self, vertices: [Vertex], edges: [Edge]):
+    # Au-delà, propagate() passe de la décomposition spectrale à Krylov
+    EIG_MAX_ORDER = 2000
+    # Nombre de mises à jour gardées dans le journal de get_changed_rows
+    ROW_LOG_SIZE = 64
+
+    def __init__(self, vertices: [Vertex], edges: [Edge], sparse: bool = False):
+        """
+        vertices : liste de Vertex
+        edges : liste de Edge
+        sparse : si True, les matrices (adjacence, incidence, laplaciens)
+                 sont stockées au format scipy.sparse CSR
+        """
         self._vertices = vertices if vertices is not None else np.array([])
         self._edges = edges if edges is not None else []
+        self._sparse = sparse
 
         self._order = len(self._vertices)
         self._size = len(self._edges)
-        
-        self.adjacency = self.get_adjacency_matrix()
-        self.incidence = self.get_incidence_matrix()
-        
-        self.laplacian = self.get_laplacian_matrix()
-        
-        
+
+        # Opérateurs calculés à la demande puis mis en cache (cf. invalidate)
+        self._cache = {}
+        self._version = 0
+
+        # Graphe construit depuis des tableaux (cf. from_edge_array) : les
+        # Vertex / Edge ne sont créés qu'à la première demande
+        self._lazy_edges = None
+        self._lazy_vertices = None
+
+    @classmethod
+    def from_edge_array(cls, src, dst, weights=None, n=None, sparse=True, vertex_ids=None, values=None):
+        """
+        Construit un graphe directement à partir des extrémités des arêtes,
+        sans créer d'objets Vertex / Edge.
+
+        src, dst : tableaux d'entiers (m,), indices 0..n-1 des extrémités
+        weights : None ou tableau (m,), coefficient coeff de chaque arête
+        n : nombre de sommets (par défaut max(src, dst) + 1)
+        sparse : stockage scipy.sparse des matrices (True par défaut)
+        vertex_ids : identifiants des sommets, tableau (n,) (0..n-1 par défaut)
+        values : None ou tableau (n,), attribut value des sommets (NaN : None)
+
+        get_vertices() et get_edges() ne créent les objets qu'au premier appel.
+        """
+        src = np.ascontiguousarray(src, dtype=np.intp)
+        dst = np.ascontiguousarray(dst, dtype=np.intp)
+        if src.shape != dst.shape or src.ndim != 1:
+            raise ValueError("src and dst must be 1-D arrays of the same length.")
+        if weights is not None:
+            weights = np.ascontiguousarray(weights, dtype=float)
+            if weights.shape != src.shape:
+                raise ValueError("weights must have the same length as src and dst.")
+        if n is None:
+            n = int(max(src.max(initial=-1), dst.max(initial=-1))) + 1
+        elif len(src) and (min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= n):
+            raise ValueError(f"Edge indices must lie in [0, {n}).")
+
+        graph = cls([], [], sparse=sparse)
+        graph._vertices = None
+        graph._edges = None
+        graph._lazy_edges = (src, dst, weights)
+        if vertex_ids is not None or values is not None:
+            ids = np.arange(n) if vertex_ids is None else np.asarray(vertex_ids)
+            if len(ids) != n or (values is not None and len(values) != n):
+                raise ValueError(f"vertex_ids and values must have length n={n}.")
+            graph._lazy_vertices = (ids, values)
+        graph._order = n
+        graph._size = len(src)
+        return graph
+
+    @classmethod
+    def from_sparse(cls, matrix, sparse=True):
+        """
+        Construit un graphe à partir d'une matrice d'adjacence (scipy.sparse
+        ou dense) : une arête par coefficient non nul du triangle supérieur
+        (diagonale comprise), de poids égal à ce coefficient.
+        """
+        matrix = sp.coo_matrix(matrix)
+        if matrix.shape[0] != matrix.shape[1]:
+            raise ValueError(f"Adjacency matrix must be square, got shape {matrix.shape}.")
+        upper = sp.triu(matrix, format="coo")
+        upper.sum_duplicates()
+        upper.eliminate_zeros()
+        return cls.from_edge_array(upper.row, upper.col, weights=upper.data, n=matrix.shape[0], sparse=sparse)
+
+    def save(self, path):
+        """Ecrit le graphe dans le répertoire path (cf. graphio.save_graph)."""
+        from .graphio import save_graph
+        save_graph(self, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None, sparse=None):
+        """Relit un graphe écrit par save (cf. graphio.load_graph)."""
+        from .graphio import load_graph
+        return load_graph(path, mmap_mode=mmap_mode, sparse=sparse)
+
     def get_vertices(self):
+        if self._vertices is None:
+            if self._lazy_vertices is None:
+                self._vertices = [Vertex(ids=idx) for idx in range(self._order)]
+            else:
+                ids, values = self._lazy_vertices
+                values = [None] * len(ids) if values is None else [None if v != v else v for v in np.asarray(values).tolist()]
+                self._vertices = [Vertex(ids=i, value=v) for i, v in zip(ids.tolist(), values)]
+                self._lazy_vertices = None
         return self._vertices
     
     def get_edges(self):
+        if self._edges is None:
+            vertices = self.get_vertices()
+            src, dst, weights = self._lazy_edges
+            coeffs = [None] * len(src) if weights is None else weights.tolist()
+            self._edges = [Edge(extremity=[vertices[i], vertices[j]], coeff=w)
+                           for i, j, w in zip(src.tolist(), dst.tolist(), coeffs)]
+            self._lazy_edges = None
         return self._edges
+
+    def get_vertex_ids(self):
+        """Identifiants des sommets, np.array (n,), sans créer les Vertex."""
+        if self._vertices is None:
+            return np.arange(self._order) if self._lazy_vertices is None else np.asarray(self._lazy_vertices[0])
+        return np.array([v._ids for v in self._vertices], dtype=np.int64)
+
+    def get_vertex_values(self):
+        """
+        Attribut value des sommets, np.array (n,) (NaN si value est None),
+        ou None si aucun sommet n'a de valeur.
+        """
+        if self._vertices is None:
+            values = None if self._lazy_vertices is None else self._lazy_vertices[1]
+            return None if values is None else np.asarray(values, dtype=float)
+        if all(v.value is None for v in self._vertices):
+            return None
+        return np.array([np.nan if v.value is None else v.value for v in self._vertices], dtype=float)
+
+    def get_edge_weights(self):
+        """Coefficients coeff des arêtes, np.array (m,) (1.0 si coeff est None)."""
+        def build():
+            if self._edges is None:
+                weights = self._lazy_edges[2]
+                return np.ones(self._size) if weights is None else weights
+            return np.fromiter((1.0 if e.coeff is None else e.coeff for e in self._edges),
+                               dtype=float, count=len(self._edges))
+
+        return self._cached("edge_weight", build)
+
+    def _cached(self, key, builder):
+        if key not in self._cache:
+            self._cache[key] = builder()
+        return self._cache[key]
+
+    def invalidate(self):
+        """
+        Vide le cache des opérateurs. A appeler après toute modification
+        directe des sommets ou des arêtes.
+        """
+        if self._vertices is not None:
+            self._order = len(self._vertices)
+        if self._edges is not None:
+            self._size = len(self._edges)
+        self._cache.clear()
+        self._version += 1
+
+    def add_vertex(self, vertex: Vertex):
+        self._vertices = list(self.get_vertices()) + [vertex]
+        self.invalidate()
+
+    def add_edge(self, edge: Edge):
+        self._edges = list(self.get_edges()) + [edge]
+        self.invalidate()
+
+    def remove_edge(self, edge: Edge):
+        self._edges = [e for e in self.get_edges() if e is not edge]
+        self.invalidate()
+
+    @profiled("Graph.set_edges")
+    def set_edges(self, edges: [Edge]):
+        self._edges = edges if edges is not None else []
+        self._lazy_edges = None
+        self.invalidate()
+
+    @profiled("Graph.set_edge_array")
+    def set_edge_array(self, src, dst, weights=None):
+        """
+        Remplace les arêtes par celles données en tableaux d'indices de
+        sommets (cf. from_edge_array) ; les Edge ne sont créés qu'à la
+        première demande de get_edges().
+        """
+        src = np.ascontiguousarray(src, dtype=np.intp)
+        dst = np.ascontiguousarray(dst, dtype=np.intp)
+        if weights is not None:
+            weights = np.ascontiguousarray(weights, dtype=float)
+        self._edges = None
+        self._lazy_edges = (src, dst, weights)
+        self._size = len(src)
+        self.invalidate()
+
+    def _edge_slots(self):
+        """Structure de mise à jour incrémentale (cf. _EdgeSlots), construite au premier appel."""
+        slots = self._cache.get("edge_slots")
+        if slots is None:
+            src, dst = self.get_edge_index()
+            weights = self._lazy_edges[2] if self._edges is None else None
+            slots = _EdgeSlots(src, dst, weights, self._order)
+            self._cache["edge_slots"] = slots
+            self._set_edge_views(slots)
+        return slots
+
+    def _set_edge_views(self, slots):
+        src, dst, weights = slots.views()
+        self._cache["edge_index"] = (src, dst)
+        if self._edges is None:
+            self._lazy_edges = (src, dst, weights)
+
+    def get_incident_edges(self, vertices):
+        """
+        Indices (dans get_edges()) des arêtes touchant les sommets d'indices
+        vertices, en O(somme de leurs degrés) une fois la structure de mise
+        à jour construite.
+        """
+        return self._edge_slots().incident(np.unique(np.asarray(vertices, dtype=np.intp)))
+
+    @profiled("Graph.update_edges")
+    def update_edges(self, removed, added):
+        """
+        Mise à jour incrémentale de la topologie.
+
+        removed : indices (dans get_edges()) des arêtes à retirer
+        added : liste de Edge à ajouter, ou couple (src, dst) de tableaux
+                d'indices de sommets (arêtes de coeff 1.0)
+
+        Les arêtes retirées sont remplacées par les dernières de la liste.
+        Les tableaux d'extrémités (get_edge_index), la liste des arêtes,
+        les degrés et, en creux, l'adjacence et le laplacien en cache sont
+        modifiés en place. Seules les lignes des extrémités des arêtes
+        touchées sont lues ou écrites (cf. _EdgeSlots) : le coût est en
+        O(k * degré), et non en O(m), y compris quand une ligne déborde
+        (elle est agrandie aux dépens de lignes voisines).
+        Pour un graphe décrit par tableaux (set_edge_array), aucun Edge
+        n'est créé. On suppose le graphe simple (pas d'arêtes multiples).
+        """
+        slots = self._edge_slots()
+        removed = np.unique(np.asarray(removed, dtype=np.intp))
+        lazy = self._edges is None
+        m = slots.m
+        k = len(removed)
+
+        if isinstance(added, tuple):
+            a_s = np.asarray(added[0], dtype=np.intp)
+            a_d = np.asarray(added[1], dtype=np.intp)
+            a_w = np.ones(len(a_s))
+            if not lazy:
+                vertices = self.get_vertices()
+                added = [Edge(extremity=[vertices[i], vertices[j]], coeff=1.0)
+                         for i, j in zip(a_s.tolist(), a_d.tolist())]
+        else:
+            added = list(added)
+            id_to_idx = self.get_id_to_idx()
+            a_s = np.fromiter((id_to_idx[e._extremity[0]._ids] for e in added), dtype=np.intp, count=len(added))
+            a_d = np.fromiter((id_to_idx[e._extremity[1]._ids] for e in added), dtype=np.intp, count=len(added))
+            a_w = np.array([1.0 if e.coeff is None else e.coeff for e in added], dtype=float)
+
+        cache = self._cache
+        A = cache.get("adjacency")
+        L = cache.get("laplacian")
+        rebuilt = False
+        if self._sparse and A is not None and not slots.owns(A, L):
+            # Premier appel : adjacence et laplacien passent dans la disposition de la table
+            rebuilt = True
+            A, L = slots.matrices(A.dtype, laplacian=L is not None)
+            cache["adjacency"] = A
+            if L is not None:
+                cache["laplacian"] = L
+        # Matrices que la table tient à jour quand elle déplace des lignes
+        slots.adjacency, slots.laplacian = (A, L) if self._sparse and A is not None else (None, None)
+
+        rs, rd = slots.src[removed], slots.dst[removed]
+        touched = np.unique(np.concatenate([rs, rd, a_s, a_d]))
+
+        # Retrait des arêtes dans les lignes de leurs extrémités
+        if k:
+            slots.remove(removed)
+
+        # Retrait par permutation avec la fin de liste : O(k)
+        keep_tail = np.setdiff1d(np.arange(m - k, m), removed, assume_unique=True)
+        holes = removed[removed < m - k]
+        if not lazy:
+            for h, t in zip(holes.tolist(), keep_tail.tolist()):
+                self._edges[h] = self._edges[t]
+            del self._edges[m - k:]
+            self._edges.extend(added)
+        slots.relocate(keep_tail, holes)
+        slots.m = m - k
+
+        # Ajouts : en fin de tableaux et dans la place libre des lignes
+        slots.moved_rows = []
+        if len(a_s) and not slots.append(a_s, a_d, a_w):
+            # Plus de place libre dans toute la table : reconstruction (rare)
+            PROFILER.count("Graph.update_edges/table_rebuilds")
+            rebuilt = True
+            slots.rebuild()
+            if self._sparse and A is not None:
+                A, L = slots.matrices(A.dtype, laplacian=L is not None)
+                cache["adjacency"] = A
+                if L is not None:
+                    cache["laplacian"] = L
+        elif self._sparse and A is not None:
+            # Seules les lignes des extrémités des arêtes touchées sont réécrites
+            slots.write_rows(A, L, touched)
+
+        self._set_edge_views(slots)
+        self._size = slots.m
+        self._version += 1
+        PROFILER.count("Graph.update_edges/removed", k)
+        PROFILER.count("Graph.update_edges/added", len(a_s))
+
+        for key in ("edge_weight", "vertex_edges", "edge_scatter", "weighted_laplacian", "incidence",
+                    "normal_laplacian", "eigh", "eigh_normal"):
+            cache.pop(key, None)
+
+        if A is None:
+            for key in ("degree", "laplacian", "row_log"):
+                cache.pop(key, None)
+            return
+
+        if self._sparse:
+            # Journal des lignes réécrites en place (cf. get_changed_rows)
+            log = cache.get("row_log")
+            if rebuilt or log is None:
+                cache["row_log"] = (self._version, [])
+            else:
+                rows = np.unique(np.concatenate([touched] + slots.moved_rows))
+                log[1].append((self._version, rows))
+                if len(log[1]) > self.ROW_LOG_SIZE:
+                    cache["row_log"] = (log[1][0][0], log[1][1:])
+
+        new_deg = slots.count[touched]
+        if "degree" in cache:
+            cache["degree"][touched] = new_deg
+        if self._sparse:
+            return
+
+        A[rs, rd] = 0
+        A[rd, rs] = 0
+        A[a_s, a_d] = 1
+        A[a_d, a_s] = 1
+        if L is not None:
+            i = np.concatenate([rs, rd, a_s, a_d])
+            j = np.concatenate([rd, rs, a_d, a_s])
+            L[i, j] = -A[i, j]
+            L[touched, touched] = new_deg - A[touched, touched]
+
+    def get_changed_rows(self, version):
+        """
+        Lignes (triées) de l'adjacence et du laplacien en cache que
+        update_edges a réécrites en place depuis la version version du
+        graphe, ou None si elles ne sont pas connues : matrices denses,
+        reconstruites ou absentes du cache depuis, version trop ancienne.
+
+        Un opérateur construit sur la disposition du laplacien en cache
+        (mêmes indptr et indices) peut ainsi n'être recalculé que sur ces
+        lignes.
+        """
+        cache = self._cache
+        log = cache.get("row_log")
+        slots = cache.get("edge_slots")
+        L = cache.get("laplacian")
+        if log is None or L is None or not slots.owns(cache.get("adjacency"), L):
+            return None
+        base, entries = log
+        if not base <= version <= self._version:
+            return None
+        rows = [r for v, r in entries if v > version]
+        return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.intp)
+
+    # Les matrices renvoyées sont partagées avec le cache : ne pas les
+    # modifier en place. update_edges, lui, les met à jour en place (ainsi
+    # que les tableaux de get_edge_index et le vecteur des degrés).
+
+    @property
+    def id_to_idx(self):
+        return self.get_id_to_idx()
+
+    @property
+    def adjacency(self):
+        return self.get_adjacency_matrix()
+
+    @property
+    def incidence(self):
+        return self.get_incidence_matrix()
+
+    @property
+    def degree(self):
+        return self.get_degree_vector()
+
+    @property
+    def laplacian(self):
+        return self.get_laplacian_matrix()
+
+    @property
+    def normal_laplacian(self):
+        return self.get_normal_laplacian_matrix()
     
     @property
     def order(self):
@@ -31,65 +725,201 @@ class Graph:
     @property
     def size(self):
         return self._size
-    
-    def get_adjacency_matrix(self):
-        vertices = self.get_vertices()
-        edges = self.get_edges()
-        n = len(vertices)
 
+    @property
+    def is_sparse(self):
+        return self._sparse
+
+    @property
+    def version(self):
+        """Compteur incrémenté à chaque modification de la topologie."""
+        return self._version
+
+    def get_id_to_idx(self):
         # Map sommet.id -> index 0..n-1
-        id_to_idx = {v._ids: idx for idx, v in enumerate(vertices)}
+        def build():
+            if self._vertices is None:
+                if self._lazy_vertices is not None:
+                    return {i: idx for idx, i in enumerate(self._lazy_vertices[0].tolist())}
+                return {idx: idx for idx in range(self._order)}
+            return {v._ids: idx for idx, v in enumerate(self._vertices)}
 
-        A = np.zeros((n, n), dtype=int)
+        return self._cached("id_to_idx", build)
 
-        for edge in edges:
-            v1, v2 = edge._extremity
-            i, j = id_to_idx[v1._ids], id_to_idx[v2._ids]
-            A[i, j] = 1
-            A[j, i] = 1  # Graphe non orienté, symétriser
+    def get_edge_index(self):
+        """
+        Indices (0..n-1) des extrémités de chaque arête, sous forme de deux
+        tableaux src, dst de longueur m.
+        """
+        return self._cached("edge_index", self._build_edge_index)
+
+    def _build_edge_index(self):
+        if self._edges is None:
+            src, dst, _ = self._lazy_edges
+            return src, dst
+        edges = self.get_edges()
+        m = len(edges)
+        id_to_idx = self.get_id_to_idx()
+
+        src = np.fromiter((id_to_idx[e._extremity[0]._ids] for e in edges), dtype=np.intp, count=m)
+        dst = np.fromiter((id_to_idx[e._extremity[1]._ids] for e in edges), dtype=np.intp, count=m)
+        return src, dst
+
+    def get_adjacency_matrix(self):
+        return self._cached("adjacency", self._build_adjacency_matrix)
+
+    def _build_adjacency_matrix(self):
+        n = self.order
+        src, dst = self.get_edge_index()
+
+        if self._sparse:
+            rows = np.concatenate([src, dst])
+            cols = np.concatenate([dst, src])
+            A = sp.coo_matrix((np.ones(len(rows), dtype=int), (rows, cols)), shape=(n, n)).tocsr()
+            A.data[:] = 1  # arêtes multiples / boucles comptées une seule fois
+            return A
+
+        A = np.zeros((n, n), dtype=int)
+        A[src, dst] = 1
+        A[dst, src] = 1  # Graphe non orienté, symétriser
 
         return A
     
     
     def get_incidence_matrix(self):
-        vertices = self.get_vertices()
-        edges = self.get_edges()
-        n = len(vertices)   # Nombre de sommets
-        m = len(edges)      # Nombre d'arêtes
-        
-        id_to_idx = {v._ids: idx for idx, v in enumerate(vertices)}
+        return self._cached("incidence", self._build_incidence_matrix)
+
+    def _build_incidence_matrix(self):
+        n = self.order   # Nombre de sommets
+        m = self.size    # Nombre d'arêtes
+        src, dst = self.get_edge_index()
+        edge_idx = np.arange(m)
+
+        if self._sparse:
+            rows = np.concatenate([src, dst])
+            cols = np.concatenate([edge_idx, edge_idx])
+            I = sp.coo_matrix((np.ones(2 * m, dtype=int), (rows, cols)), shape=(n, m)).tocsr()
+            I.data[:] = 1  # boucle : une seule entrée
+            return I
+
         I = np.zeros((n, m), dtype=int)
-        
-        for edge_idx, edge in enumerate(edges):
-            v1, v2 = edge._extremity
-            i = id_to_idx[v1._ids]
-            j = id_to_idx[v2._ids]
-            I[i, edge_idx] = 1
-            I[j, edge_idx] = 1
+        I[src, edge_idx] = 1
+        I[dst, edge_idx] = 1
             
         return I
     
+    def get_degree_vector(self):
+        return self._cached("degree", lambda: np.asarray(self.get_adjacency_matrix().sum(axis=1)).ravel())
+
+    @profiled("Graph.get_laplacian_matrix")
     def get_laplacian_matrix(self):
+        return self._cached("laplacian", self._build_laplacian_matrix)
+
+    def _build_laplacian_matrix(self):
         A = self.get_adjacency_matrix()
-        degrees = np.sum(A, axis=1)
+        degrees = self.get_degree_vector()
+        if self._sparse:
+            return (sp.diags(degrees, format="csr", dtype=A.dtype) - A).tocsr()
         D = np.diag(degrees)
         L = D - A
         return L
     
+    def get_weighted_laplacian_matrix(self):
+        """
+        Laplacien pondéré par les coefficients coeff des arêtes,
+        L = diag(sum_j w_ij) - W (assemblage par core.kernels).
+        """
+        def build():
+            src, dst = self.get_edge_index()
+            L = kernels.laplacian_csr(src, dst, self.get_edge_weights(), self.order)
+            return L if self._sparse else L.toarray()
+
+        return self._cached("weighted_laplacian", build)
+
+    @profiled("Graph.get_normal_laplacian_matrix")
     def get_normal_laplacian_matrix(self):
+        return self._cached("normal_laplacian", self._build_normal_laplacian_matrix)
+
+    def _build_normal_laplacian_matrix(self):
         adjacency = self.get_adjacency_matrix()
-        degree = np.sum(adjacency, axis=1)
+        degree = self.get_degree_vector()
         
-        D_inv_sqrt = np.zeros((self.order, self.order))
-        for i in range(self.order):
-            if degree[i] > 0:
-                D_inv_sqrt[i, i] = 1.0 / np.sqrt(degree[i])
+        d_inv_sqrt = np.zeros(self.order)
+        mask = degree > 0
+        d_inv_sqrt[mask] = 1.0 / np.sqrt(degree[mask])
+
+        if self._sparse:
+            D_inv_sqrt = sp.diags(d_inv_sqrt, format="csr")
+            I = sp.identity(self.order, format="csr")
+            return (I - D_inv_sqrt @ adjacency @ D_inv_sqrt).tocsr()
         
         I = np.eye(self.order)
-        normalized_laplacian = I - D_inv_sqrt @ adjacency @ D_inv_sqrt
+        normalized_laplacian = I - d_inv_sqrt[:, None] * adjacency * d_inv_sqrt[None, :]
         
         return normalized_laplacian
     
+    def get_eigen_decomposition(self, normalized=False):
+        """
+        Valeurs propres croissantes et vecteurs propres orthonormés du
+        laplacien (ou du laplacien normalisé), mis en cache.
+        """
+        def build():
+            L = self.get_normal_laplacian_matrix() if normalized else self.get_laplacian_matrix()
+            L = L.toarray() if self._sparse else L
+            return np.linalg.eigh(np.asarray(L, dtype=float))
+
+        return self._cached("eigh_normal" if normalized else "eigh", build)
+
+    def propagate(self, u0, times, diffusion=1.0, normalized=False, method="auto"):
+        """
+        Solution exacte de la diffusion pure du/dt = -D L u :
+
+            u(t) = exp(-t D L) u0
+
+        u0 : np.array (n,) ou (n, B)
+        times : instants de sortie
+        diffusion : float, ou np.array (n,) (méthode "krylov" uniquement)
+        method : "eig" (décomposition spectrale en cache, petits graphes),
+                 "krylov" (expm_multiply, grands graphes creux) ou "auto"
+
+        Renvoie un np.array de forme (len(times),) + u0.shape.
+        """
+        u0 = np.asarray(u0, dtype=float)
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+
+        if method == "auto":
+            small = self.order <= self.EIG_MAX_ORDER
+            method = "eig" if small and np.ndim(diffusion) == 0 else "krylov"
+
+        if method == "eig":
+            if np.ndim(diffusion) != 0:
+                raise ValueError("method='eig' requires a scalar diffusion coefficient.")
+            eigvals, eigvecs = self.get_eigen_decomposition(normalized)
+            coeffs = eigvecs.T @ u0
+            decay = np.exp(-diffusion * np.outer(times, eigvals))
+            if u0.ndim == 1:
+                return (decay * coeffs) @ eigvecs.T
+            return np.einsum("tk,kb,ik->tib", decay, coeffs, eigvecs)
+
+        if method == "krylov":
+            L = self.get_normal_laplacian_matrix() if normalized else self.get_laplacian_matrix()
+            if np.ndim(diffusion) == 0:
+                A = -diffusion * L
+            elif self._sparse:
+                A = -(sp.diags(np.asarray(diffusion, dtype=float)) @ L)
+            else:
+                A = -np.asarray(diffusion, dtype=float)[:, None] * L
+            A = A.astype(float)
+
+            steps = np.diff(times)
+            if len(times) > 2 and np.allclose(steps, steps[0]):
+                # Grille régulière : une seule passe de expm_multiply
+                return spla.expm_multiply(A, u0, start=times[0], stop=times[-1],
+                                          num=len(times), endpoint=True)
+            return np.stack([spla.expm_multiply(t * A, u0) for t in times])
+
+        raise ValueError(f"Unknown propagation method: {method!r}")
+
     '''
     def get_div_matrix(self):
         B = self.get_incidence_matrix()
@@ -101,33 +931,36 @@ class Graph:
         return div
     '''
     
-    def get_div_matrix(self, u, c):
+    @profiled("Graph.get_div_matrix")
+    def get_div_matrix(self, u, c, flux="central"):
         """
         Calcul de la divergence type Keller–Segel sur un graphe non orienté.
     
-        u : np.array, densité sur chaque nœud
-        c : np.array, potentiel/champ attractif sur chaque nœud
+        u : np.array, densité sur chaque nœud, forme (n,) ou (n, B)
+        c : np.array, potentiel/champ attractif sur chaque nœud, forme (n,) ou (n, B)
+        flux : loi de flux par arête, "central" (par défaut), "upwind" ou
+               "normalized" (cf. core.kernels)
+
+        Avec des entrées 2-D, chaque colonne est un état indépendant et
+        la divergence est renvoyée sous forme (n, B).
         """
-        n = self._order
-        div = np.zeros(n)
-        id_to_idx = {v._ids: idx for idx, v in enumerate(self._vertices)}
-    
-        for edge in self._edges:
-            i = id_to_idx[edge._extremity[0]._ids]
-            j = id_to_idx[edge._extremity[1]._ids]
-    
-            # Flux symétrique
-            f_edge = 0.5 * (u[i] + u[j]) * (c[j] - c[i])
-    
-            # Contribution à la divergence
-            div[i] += f_edge
-            div[j] -= f_edge
-    
-        return div
+        src, dst = self.get_edge_index()
+        batched = np.ndim(u) > 1 or np.ndim(c) > 1
+        scatter = (self._cached("edge_scatter", lambda: kernels.edge_scatter_matrix(src, dst, self._order))
+                   if batched else None)
+        if flux == "central" and not kernels.USE_NUMBA:
+            return keller_segel_divergence(src, dst, u, c, self._order, scatter=scatter)
+        degree = self.get_degree_vector() if flux == "normalized" else None
+        vertex_edges = (self._cached("vertex_edges", lambda: kernels.vertex_edge_index(src, dst, self._order))
+                        if kernels.USE_NUMBA and not batched else None)
+        return kernels.divergence(src, dst, u, c, self._order, flux=flux, degree=degree, vertex_edges=vertex_edges,
+                                  scatter=scatter)
 
 
     
         
     def __str__(self):
+        if self._vertices is None or self._edges is None:
+            return f"Graph(order={self._order}, size={self._size}, sparse={self._sparse})"
         return f"Graph(vertices={self._vertices}, edges ={self._edges})"
 
@@ -0,0 +1,122 @@
+import json
+import os
+
+import numpy as np
+
+from .graph import Graph
+from .cellgraph import CellGraph
+from .Cell.population import CellPopulation
+from .checkpoint import _cell_classes
+from .mobility import Mobility
+
+
+''' Format binaire des graphes : un répertoire de fichiers .npy bruts et un meta.json '''
+
+FORMAT_VERSION = 1
+
+
+def _save_arrays(path, meta, arrays):
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        if array is not None:
+            np.save(os.path.join(path, f"{name}.npy"), array)
+    meta = dict(meta, version=FORMAT_VERSION, arrays=[name for name, array in arrays.items() if array is not None])
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _load_arrays(path, kind, mmap_mode):
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta["version"] > FORMAT_VERSION:
+        raise ValueError(f"Unsupported graph format version {meta['version']}.")
+    if meta["kind"] != kind:
+        raise ValueError(f"{path} holds a {meta['kind']}, not a {kind}.")
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in meta["arrays"]}
+    return meta, arrays
+
+
+def _graph_arrays(graph):
+    src, dst = graph.get_edge_index()
+    return {"src": np.asarray(src, dtype=np.intp),
+            "dst": np.asarray(dst, dtype=np.intp),
+            "weights": graph.get_edge_weights(),
+            "vertex_ids": graph.get_vertex_ids().astype(np.int64),
+            "values": graph.get_vertex_values()}
+
+
+def save_graph(graph, path):
+    """
+    Ecrit graph dans le répertoire path : extrémités des arêtes (src, dst),
+    coefficients coeff (1.0 pour None), identifiants et valeurs des sommets
+    (NaN pour None).
+    """
+    _save_arrays(path, {"kind": "Graph", "order": graph.order, "size": graph.size, "sparse": graph.is_sparse},
+                 _graph_arrays(graph))
+
+
+def load_graph(path, mmap_mode=None, sparse=None):
+    """
+    Relit un graphe écrit par save_graph, sans créer d'objets Vertex / Edge
+    (cf. Graph.from_edge_array).
+
+    mmap_mode : None (lecture en mémoire) ou mode de np.load ("r", "c",
+                "r+") : les tableaux sont projetés en mémoire et partagés
+                entre processus
+    sparse : None pour reprendre le stockage d'origine
+    """
+    meta, arrays = _load_arrays(path, "Graph", mmap_mode)
+    return _graph_from_arrays(meta, arrays, sparse)
+
+
+def _graph_from_arrays(meta, arrays, sparse):
+    return Graph.from_edge_array(arrays["src"], arrays["dst"], weights=arrays["weights"], n=meta["order"],
+                                 sparse=meta["sparse"] if sparse is None else sparse,
+                                 vertex_ids=arrays["vertex_ids"], values=arrays.get("values"))
+
+
+def save_cellgraph(cellgraph, path):
+    """
+    Ecrit cellgraph dans le répertoire path : le graphe (cf. save_graph),
+    les positions, types et identifiants des cellules et les paramètres
+    de la règle de connexion.
+    """
+    population = cellgraph.population
+    arrays = _graph_arrays(cellgraph.graph)
+    arrays.update(positions=population.positions, type_codes=population.type_codes, ids=population.ids)
+    meta = {"kind": "CellGraph", "order": cellgraph.graph.order, "size": cellgraph.graph.size,
+            "sparse": cellgraph.sparse, "connect_rule": cellgraph.connect_rule,
+            "radius": cellgraph.radius, "k": cellgraph.k, "skin": cellgraph.skin,
+            "cell_types": [f"{cls.__module__}.{cls.__qualname__}" for cls in population.cell_types]}
+    _save_arrays(path, meta, arrays)
+
+
+def load_cellgraph(path, mmap_mode=None, mobility=None):
+    """
+    Relit un CellGraph écrit par save_cellgraph. Les arêtes sont reprises
+    telles quelles (pas de recalcul de la règle de connexion) et les objets
+    Cell / Vertex / Edge ne sont créés qu'à la première demande.
+
+    mmap_mode : cf. load_graph ; avec "r" les positions sont en lecture
+                seule, utiliser "c" (copie à l'écriture) pour simuler
+    mobility : Mobility (par défaut marche aléatoire des Microglia)
+    """
+    meta, arrays = _load_arrays(path, "CellGraph", mmap_mode)
+    classes = _cell_classes()
+    missing = [name for name in meta["cell_types"] if name not in classes]
+    if missing:
+        raise ValueError(f"Unknown cell types in {path}: {missing}")
+
+    cellgraph = CellGraph.__new__(CellGraph)
+    cellgraph._cells = None
+    cellgraph.population = CellPopulation.from_arrays(arrays["positions"], [classes[name] for name in meta["cell_types"]],
+                                                      arrays["type_codes"], ids=arrays["ids"])
+    cellgraph.sparse = meta["sparse"]
+    cellgraph.mobility = mobility if mobility is not None else Mobility()
+    cellgraph.radius = meta["radius"]
+    cellgraph.k = meta["k"]
+    cellgraph.skin = meta["skin"]
+    cellgraph.connect_rule = meta["connect_rule"]
+    cellgraph.graph = _graph_from_arrays(meta, arrays, None)
+    cellgraph._init_state()
+    return cellgraph
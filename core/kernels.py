@@ -0,0 +1,227 @@
+import numpy as np
+import scipy.sparse as sp
+
+try:
+    import numba
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    numba = None
+    HAVE_NUMBA = False
+
+
+''' Noyaux par arête (flux, assemblage) : version Numba optionnelle, repli NumPy '''
+
+# Lois de flux sur l'arête (s, d), comptées +f en s et -f en d :
+#   "central" : 0.5 (u_s + u_d)(c_d - c_s)       (flux historique de get_div_matrix)
+#   "upwind" : u_amont (c_d - c_s), u_amont = u_d si c_d >= c_s, u_s sinon
+#              (f > 0 retire de la masse à d : la densité est prise au donneur)
+#   "normalized" : flux central divisé par sqrt(deg_s deg_d)
+FLUXES = ("central", "upwind", "normalized")
+
+# Numba utilisé par défaut s'il est installé (cf. set_use_numba)
+USE_NUMBA = HAVE_NUMBA
+
+
+def set_use_numba(flag):
+    """Active / désactive les noyaux compilés (sans effet si Numba est absent)."""
+    global USE_NUMBA
+    USE_NUMBA = bool(flag) and HAVE_NUMBA
+
+
+def _check_flux(flux):
+    if flux not in FLUXES:
+        raise ValueError(f"Unknown flux law: {flux!r}")
+
+
+def edge_flux(src, dst, u, c, flux="central", degree=None):
+    """
+    Flux sur chaque arête (NumPy), u et c de forme (n,) ou (n, B).
+
+    En "upwind", la densité est celle du sommet qui perd de la masse :
+        >>> edge_flux(np.array([0]), np.array([1]), np.array([0., 1.]), np.array([0., 1.]), "upwind")
+        array([1.])
+    """
+    _check_flux(flux)
+    # Opérations en place : avec B états, chaque temporaire est (m, B)
+    dc = np.take(c, dst, axis=0)
+    dc -= np.take(c, src, axis=0)
+    if flux == "upwind":
+        f = np.where(dc >= 0, np.take(u, dst, axis=0), np.take(u, src, axis=0))
+    else:
+        f = np.take(u, src, axis=0)
+        f += np.take(u, dst, axis=0)
+        f *= 0.5
+    if f.shape == dc.shape:
+        f *= dc
+    else:
+        f = f * dc
+    if flux == "upwind":
+        return f
+    if flux == "normalized":
+        scale = 1.0 / np.sqrt(np.maximum(degree[src] * degree[dst], 1))
+        f *= scale.reshape(scale.shape + (1,) * (f.ndim - 1))
+    return f
+
+
+def vertex_edge_index(src, dst, n):
+    """
+    Arêtes incidentes à chaque sommet au format CSR : les arêtes du sommet
+    i sont edges[indptr[i]:indptr[i + 1]], avec le signe +1 (i = src) ou
+    -1 (i = dst). Permet de sommer les flux par sommet sans conflit
+    d'écriture entre threads.
+    """
+    m = len(src)
+    ends = np.concatenate([src, dst])
+    order = np.argsort(ends, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.intp)
+    np.cumsum(np.bincount(ends, minlength=n), out=indptr[1:])
+    edges = (order % m).astype(np.intp) if m else np.empty(0, dtype=np.intp)
+    sign = np.where(order < m, 1.0, -1.0)
+    return indptr, edges, sign
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _divergence_numba(indptr, edges, sign, src, dst, u, c, law, degree, out):
+        n = len(indptr) - 1
+        for i in prange(n):
+            acc = 0.0
+            for k in range(indptr[i], indptr[i + 1]):
+                e = edges[k]
+                s = src[e]
+                d = dst[e]
+                dc = c[d] - c[s]
+                if law == 1:
+                    f = (u[d] if dc >= 0 else u[s]) * dc
+                else:
+                    f = 0.5 * (u[s] + u[d]) * dc
+                    if law == 2:
+                        f /= np.sqrt(max(degree[s] * degree[d], 1.0))
+                acc += sign[k] * f
+            out[i] = acc
+        return out
+
+    @njit(cache=True)
+    def _laplacian_csr_numba(src, dst, weights, n):
+        # Comptage des entrées par ligne (diagonale + voisins), puis remplissage
+        m = len(src)
+        count = np.ones(n, dtype=np.intp)
+        for e in range(m):
+            if src[e] != dst[e]:
+                count[src[e]] += 1
+                count[dst[e]] += 1
+        indptr = np.zeros(n + 1, dtype=np.intp)
+        for i in range(n):
+            indptr[i + 1] = indptr[i] + count[i]
+        indices = np.empty(indptr[n], dtype=np.intp)
+        data = np.zeros(indptr[n])
+        fill = indptr[:-1].copy()
+        for i in range(n):
+            indices[fill[i]] = i
+            fill[i] += 1
+        for e in range(m):
+            s = src[e]
+            d = dst[e]
+            if s == d:
+                continue
+            w = weights[e]
+            data[indptr[s]] += w
+            data[indptr[d]] += w
+            indices[fill[s]] = d
+            data[fill[s]] = -w
+            fill[s] += 1
+            indices[fill[d]] = s
+            data[fill[d]] = -w
+            fill[d] += 1
+        return indptr, indices, data
+
+
+def edge_scatter_matrix(src, dst, n):
+    """
+    Opérateur creux S (n, m) de répartition des flux d'arête sur les
+    sommets : (S @ f)_i = sum_{src_e = i} f_e - sum_{dst_e = i} f_e.
+    Construit en O(m) au format CSC (deux entrées +1, -1 par colonne, sans
+    tri), il remplace np.add.at pour des flux (m, B).
+    """
+    m = len(src)
+    indices = np.empty(2 * m, dtype=np.intp)
+    indices[0::2] = src
+    indices[1::2] = dst
+    data = np.empty(2 * m)
+    data[0::2] = 1.0
+    data[1::2] = -1.0
+    return sp.csc_matrix((data, indices, np.arange(0, 2 * m + 1, 2)), shape=(n, m))
+
+
+def scatter_flux(src, dst, f, n, scatter=None):
+    """
+    Divergence sum_e (+/-) f_e par sommet : bincount pour f de forme (m,),
+    produit creux S @ f pour f de forme (m, B).
+
+    scatter : edge_scatter_matrix(src, dst, n) précalculé
+    """
+    if f.ndim == 1:
+        return np.bincount(src, weights=f, minlength=n) - np.bincount(dst, weights=f, minlength=n)
+    if scatter is None:
+        scatter = edge_scatter_matrix(src, dst, n)
+    return scatter @ f
+
+
+def divergence(src, dst, u, c, n, flux="central", degree=None, vertex_edges=None, scatter=None):
+    """
+    Divergence sum_e (+/-) f_e par sommet pour la loi de flux flux.
+
+    degree : degrés des sommets (requis pour "normalized")
+    vertex_edges : vertex_edge_index(src, dst, n) précalculé (noyau Numba)
+    scatter : edge_scatter_matrix(src, dst, n) précalculé (entrées (n, B))
+
+    Le noyau Numba (boucle prange sur les sommets) est utilisé pour u et c
+    de forme (n,) ; sinon, ou sans Numba, repli NumPy.
+
+    Positivité en "upwind" : un sommet vide ne cède rien
+        >>> src, dst, c = np.array([0]), np.array([1]), np.array([0., 1.])
+        >>> divergence(src, dst, np.array([1., 0.]), c, 2, "upwind")
+        array([0., 0.])
+        >>> divergence(src, dst, np.array([0., 1.]), c, 2, "upwind")
+        array([ 1., -1.])
+    """
+    _check_flux(flux)
+    u = np.asarray(u, dtype=float)
+    c = np.asarray(c, dtype=float)
+    if flux == "normalized" and degree is None:
+        raise ValueError("The 'normalized' flux requires the vertex degrees.")
+
+    if USE_NUMBA and u.ndim == 1 and c.ndim == 1:
+        if vertex_edges is None:
+            vertex_edges = vertex_edge_index(src, dst, n)
+        indptr, edges, sign = vertex_edges
+        deg = np.asarray(degree, dtype=float) if degree is not None else np.ones(n)
+        return _divergence_numba(indptr, edges, sign, src, dst, u, c, FLUXES.index(flux), deg, np.empty(n))
+
+    if u.ndim < c.ndim:
+        u = u[:, None]
+    elif c.ndim < u.ndim:
+        c = c[:, None]
+    return scatter_flux(src, dst, edge_flux(src, dst, u, c, flux, degree), n, scatter)
+
+
+def laplacian_csr(src, dst, weights, n):
+    """
+    Laplacien pondéré L = diag(sum_j w_ij) - W au format CSR (les boucles
+    sont ignorées, les arêtes multiples additionnées).
+    """
+    weights = np.ones(len(src)) if weights is None else np.asarray(weights, dtype=float)
+    if USE_NUMBA:
+        indptr, indices, data = _laplacian_csr_numba(src, dst, weights, n)
+        L = sp.csr_matrix((data, indices, indptr), shape=(n, n))
+        L.sum_duplicates()
+        return L
+
+    keep = src != dst
+    s, d, w = src[keep], dst[keep], weights[keep]
+    deg = np.bincount(s, weights=w, minlength=n) + np.bincount(d, weights=w, minlength=n)
+    rows = np.concatenate([np.arange(n), s, d])
+    cols = np.concatenate([np.arange(n), d, s])
+    data = np.concatenate([deg, -w, -w])
+    return sp.coo_matrix((data, (rows, cols)), shape=(n, n)).tocsr()
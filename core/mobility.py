@@ -0,0 +1,158 @@
+import numpy as np
+
+from .Cell.cell import Microglia
+
+
+def make_rng(seed=None):
+    """Generator NumPy initialisé via SeedSequence."""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return np.random.default_rng(seed)
+
+
+def spawn_rngs(seed, n):
+    """
+    n générateurs indépendants et reproductibles dérivés d'une même
+    graine (un par membre d'ensemble ou par processus).
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(s) for s in seed.spawn(n)]
+
+
+''' Modèles de déplacement : displacement(...) -> np.array (k, d) '''
+
+class RandomWalk:
+    """
+    Pas gaussien step * dt * xi : modèle historique de
+    CellGraph.update_positions.
+    """
+
+    def __init__(self, step=1.0):
+        self.step = step
+
+    def displacement(self, population, idx, dt, rng, graph=None, c=None):
+        return rng.standard_normal((len(idx), population.dim)) * (self.step * dt)
+
+
+class Brownian:
+    """Mouvement brownien : sigma * sqrt(dt) * xi."""
+
+    def __init__(self, sigma=1.0):
+        self.sigma = sigma
+
+    def displacement(self, population, idx, dt, rng, graph=None, c=None):
+        return rng.standard_normal((len(idx), population.dim)) * (self.sigma * np.sqrt(dt))
+
+
+class Chemotaxis:
+    """
+    Dérive chimiotactique vers les c croissants plus bruit brownien :
+
+        dx = chi * grad(c) dt + sigma * sqrt(dt) * xi
+
+    Le gradient de c au sommet i est estimé sur le graphe :
+
+        grad_i = 1/deg_i * sum_j (c_j - c_i) (x_j - x_i) / |x_j - x_i|^2
+    """
+
+    def __init__(self, chi=1.0, sigma=0.0):
+        self.chi = chi
+        self.sigma = sigma
+
+    def gradient(self, graph, positions, c):
+        src, dst = graph.get_edge_index()
+        c = np.asarray(c, dtype=float)
+        dx = positions[dst] - positions[src]
+        dist2 = np.sum(dx ** 2, axis=1)
+        w = np.divide(c[dst] - c[src], dist2, out=np.zeros_like(dist2), where=dist2 > 0)
+        contrib = w[:, None] * dx
+
+        grad = np.zeros_like(positions)
+        np.add.at(grad, src, contrib)
+        np.add.at(grad, dst, contrib)  # (c_i - c_j)(x_i - x_j) = même contribution
+        deg = np.bincount(src, minlength=len(positions)) + np.bincount(dst, minlength=len(positions))
+        return grad / np.maximum(deg, 1)[:, None]
+
+    def displacement(self, population, idx, dt, rng, graph=None, c=None):
+        if graph is None or c is None:
+            raise ValueError("Chemotaxis requires the graph and the attractant field c.")
+        drift = self.chi * self.gradient(graph, population.positions, c)[idx] * dt
+        if self.sigma:
+            drift += rng.standard_normal(drift.shape) * (self.sigma * np.sqrt(dt))
+        return drift
+
+
+class PersistentWalk:
+    """
+    Marche persistante : la vitesse suit un processus d'Ornstein–Uhlenbeck
+
+        v <- v exp(-dt / tau) + speed * sqrt(1 - exp(-2 dt / tau)) * xi
+        dx = v dt
+    """
+
+    def __init__(self, speed=1.0, persistence_time=1.0):
+        self.speed = speed
+        self.persistence_time = persistence_time
+        self.velocity = None
+
+    def displacement(self, population, idx, dt, rng, graph=None, c=None):
+        if self.velocity is None or self.velocity.shape != population.positions.shape:
+            self.velocity = np.zeros_like(population.positions)
+        decay = np.exp(-dt / self.persistence_time)
+        noise = rng.standard_normal((len(idx), population.dim)) * (self.speed * np.sqrt(1 - decay ** 2))
+        self.velocity[idx] = decay * self.velocity[idx] + noise
+        return self.velocity[idx] * dt
+
+
+class Mobility:
+    """
+    Déplacement vectorisé des cellules mobiles d'une CellPopulation.
+
+    model : modèle de déplacement (RandomWalk par défaut)
+    cell_type : type des cellules mobiles (Microglia par défaut)
+    boundary : "clip" (on ramène sur le bord) ou "reflect" (réflexion)
+    bounds : (min, max) du domaine, appliqué à chaque coordonnée
+    seed : graine, SeedSequence ou Generator
+    record_history : enregistre les cellules déplacées dans population.history
+                     (seules les cellules mobiles y ont une ligne)
+    """
+
+    def __init__(self, model=None, cell_type=Microglia, boundary="clip", bounds=(0, 3), seed=None,
+                 record_history=False):
+        if boundary not in ("clip", "reflect"):
+            raise ValueError(f"Unknown boundary condition: {boundary!r}")
+        self.model = model if model is not None else RandomWalk()
+        self.cell_type = cell_type
+        self.boundary = boundary
+        self.bounds = bounds
+        self.rng = make_rng(seed)
+        self.record_history = record_history
+
+    def apply_boundary(self, x, bounds=None):
+        lo, hi = self.bounds if bounds is None else bounds
+        if self.boundary == "clip":
+            return np.clip(x, lo, hi)
+        # Réflexion (éventuellement multiple) sur [lo, hi]
+        width = hi - lo
+        y = np.mod(x - lo, 2 * width)
+        return lo + np.where(y > width, 2 * width - y, y)
+
+    def step(self, population, dt, bounds=None, graph=None, c=None):
+        """
+        Déplace toutes les cellules mobiles en un seul tirage.
+        Renvoie les indices des cellules déplacées.
+        """
+        idx = population.indices(self.cell_type)
+        if len(idx) == 0:
+            return idx
+        pos = population.positions
+        if self.record_history:
+            population.track_cells(idx)
+        disp = self.model.displacement(population, idx, dt, self.rng, graph=graph, c=c)
+        pos[idx] = self.apply_boundary(pos[idx] + disp, bounds)
+        if self.record_history:
+            population.record_history(idx)
+        return idx
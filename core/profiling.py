@@ -0,0 +1,193 @@
+import functools
+import json
+import time
+import tracemalloc
+
+
+''' Chronomètres et compteurs pour repérer les points chauds des simulations '''
+
+class _NullTimer:
+    """Contexte vide renvoyé par Profiler.timer quand le profilage est désactivé."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.memory = self.profiler.track_memory
+        self.mem0 = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        allocated = max(tracemalloc.get_traced_memory()[0] - self.mem0, 0) if self.memory else 0
+        self.profiler._add(self.name, elapsed, allocated)
+        return False
+
+
+class Profiler:
+    """
+    Statistiques par section nommée : nombre d'appels, temps total,
+    min et max, octets alloués (solde net de tracemalloc, si track_memory).
+
+    Désactivé par défaut : timer() renvoie alors un contexte vide et les
+    fonctions décorées par profiled() ne font qu'un test de drapeau.
+
+        with PROFILER.timer("step/diffusion"):
+            ...
+        PROFILER.count("edges_added", k)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self.stats = {}
+        self.counters = {}
+        self._started_tracemalloc = False
+
+    def enable(self, memory=False):
+        """Active le profilage ; memory=True mesure aussi les allocations (plus lent)."""
+        self.enabled = True
+        self.track_memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def disable(self):
+        self.enabled = False
+        self.track_memory = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self):
+        self.stats = {}
+        self.counters = {}
+
+    def timer(self, name):
+        """Contexte chronométrant la section name."""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def count(self, name, n=1):
+        """Incrémente le compteur name de n."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _add(self, name, elapsed, allocated):
+        stat = self.stats.get(name)
+        if stat is None:
+            self.stats[name] = {"calls": 1, "time": elapsed, "min": elapsed, "max": elapsed, "bytes": allocated}
+            return
+        stat["calls"] += 1
+        stat["time"] += elapsed
+        stat["min"] = min(stat["min"], elapsed)
+        stat["max"] = max(stat["max"], elapsed)
+        stat["bytes"] += allocated
+
+    def report(self, **meta):
+        """Rapport de la session (dict sérialisable en JSON) ; meta est recopié tel quel."""
+        return {"meta": meta,
+                "timers": {name: dict(stat) for name, stat in self.stats.items()},
+                "counters": dict(self.counters)}
+
+    def to_json(self, path, **meta):
+        with open(path, "w") as f:
+            json.dump(self.report(**meta), f, indent=2)
+
+    def table(self):
+        return format_table(self.report())
+
+
+# Profileur global utilisé par les méthodes instrumentées de core
+PROFILER = Profiler()
+
+
+def profiled(name=None, profiler=PROFILER):
+    """
+    Décorateur chronométrant chaque appel de la fonction sous le nom name
+    (par défaut son nom qualifié).
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with _Timer(profiler, label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class profiling:
+    """
+    Active PROFILER le temps d'un bloc, après l'avoir remis à zéro :
+
+        with profiling() as prof:
+            run()
+        print(prof.table())
+    """
+
+    def __init__(self, memory=False, profiler=PROFILER, reset=True):
+        self.profiler = profiler
+        self.memory = memory
+        self.reset = reset
+
+    def __enter__(self):
+        if self.reset:
+            self.profiler.reset()
+        self.profiler.enable(memory=self.memory)
+        return self.profiler
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        return False
+
+
+def merge_reports(*reports):
+    """Agrège plusieurs rapports (plusieurs runs) en un seul."""
+    merged = {"meta": {"runs": len(reports)}, "timers": {}, "counters": {}}
+    for report in reports:
+        for name, stat in report["timers"].items():
+            total = merged["timers"].get(name)
+            if total is None:
+                merged["timers"][name] = dict(stat)
+                continue
+            total["calls"] += stat["calls"]
+            total["time"] += stat["time"]
+            total["min"] = min(total["min"], stat["min"])
+            total["max"] = max(total["max"], stat["max"])
+            total["bytes"] += stat["bytes"]
+        for name, value in report["counters"].items():
+            merged["counters"][name] = merged["counters"].get(name, 0) + value
+    return merged
+
+
+def format_table(report):
+    """
+    Tableau texte des sections, triées par temps total décroissant (les
+    temps sont inclusifs : une section imbriquée est aussi comptée dans
+    la section englobante).
+    """
+    lines = [f"{'section':40s} {'calls':>8s} {'total (s)':>11s} {'mean (ms)':>10s} {'max (ms)':>10s} {'MiB':>8s}"]
+    for name, stat in sorted(report["timers"].items(), key=lambda item: -item[1]["time"]):
+        lines.append(f"{name:40s} {stat['calls']:8d} {stat['time']:11.4f} {1e3 * stat['time'] / stat['calls']:10.4f} "
+                     f"{1e3 * stat['max']:10.4f} {stat['bytes'] / 2**20:8.2f}")
+    for name, value in sorted(report["counters"].items()):
+        lines.append(f"{name:40s} {value:8d}")
+    return "\n".join(lines)
@@ -0,0 +1,123 @@
+import weakref
+
+import numpy as np
+
+from .Cell.cell import Neuron, Astrocyte, Microglia
+
+
+''' Noyaux de réaction élémentaires : kernel(u, c) -> du '''
+
+class Logistic:
+    """Croissance logistique rate * u * (1 - u)."""
+
+    def __init__(self, rate=0.1):
+        self.rate = rate
+
+    def __call__(self, u, c):
+        return self.rate * u * (1 - u)
+
+
+class Degradation:
+    """Dégradation linéaire -rate * u."""
+
+    def __init__(self, rate=0.05):
+        self.rate = rate
+
+    def __call__(self, u, c):
+        return -self.rate * u
+
+
+class AttractantResponse:
+    """Production proportionnelle au champ attractif : rate * c."""
+
+    def __init__(self, rate=0.02):
+        self.rate = rate
+
+    def __call__(self, u, c):
+        return self.rate * np.broadcast_to(c, u.shape)
+
+
+class ReactionRegistry:
+    """
+    Termes de réaction par type de cellule.
+
+    Chaque noyau kernel(u, c) n'est évalué qu'une fois, sur le sous-tableau
+    des cellules de son type (masque précalculé par population). Une
+    cellule utilise le noyau du type enregistré le plus proche dans sa
+    hiérarchie de classes, ce qui couvre les sous-classes de Cell définies
+    par l'utilisateur.
+    """
+
+    def __init__(self):
+        self._kernels = {}
+        self._groups = weakref.WeakKeyDictionary()
+
+    def register(self, cell_type, kernel=None):
+        """
+        Associe kernel à cell_type. Utilisable comme décorateur :
+
+            @registry.register(Neuron)
+            def growth(u, c): ...
+        """
+        if kernel is None:
+            return lambda k: self.register(cell_type, k)
+        self._kernels[cell_type] = kernel
+        self._groups.clear()
+        return kernel
+
+    def unregister(self, cell_type):
+        self._kernels.pop(cell_type, None)
+        self._groups.clear()
+
+    def get_kernel(self, cell_type):
+        for cls in cell_type.__mro__:
+            if cls in self._kernels:
+                return self._kernels[cls]
+        return None
+
+    def _get_groups(self, population):
+        """Liste [(masque, noyau)] pour une population, mise en cache."""
+        groups = self._groups.get(population)
+        if groups is None:
+            codes_by_kernel = {}
+            for code, cls in enumerate(population.cell_types):
+                kernel = self.get_kernel(cls)
+                if kernel is not None:
+                    codes_by_kernel.setdefault(id(kernel), (kernel, []))[1].append(code)
+            groups = [(np.isin(population.type_codes, codes), kernel)
+                      for kernel, codes in codes_by_kernel.values()]
+            self._groups[population] = groups
+        return groups
+
+    def evaluate(self, population, u, c=None):
+        """
+        Terme de réaction pour toute la population.
+
+        u : np.array (n,) ou (n, B)
+        c : np.array (n,) ou (n, B), champ attractif (optionnel)
+        """
+        u = np.asarray(u, dtype=float)
+        if c is not None:
+            c = np.asarray(c, dtype=float)
+            if c.ndim < u.ndim:
+                c = c[:, None]
+        du = np.zeros_like(u)
+        for mask, kernel in self._get_groups(population):
+            du[mask] = kernel(u[mask], None if c is None else c[mask])
+        return du
+
+    def bind(self, population, c=None):
+        """
+        Fonction reaction(u) à passer aux intégrateurs
+        (cf. core.integrators.make_rhs).
+        """
+        return lambda u: self.evaluate(population, u, c)
+
+
+def default_reactions():
+    """Réactions du modèle de main_edo_graph.py."""
+    registry = ReactionRegistry()
+    registry.register(Neuron, Logistic(0.1))              # Croissance logistique
+    registry.register(Astrocyte, Degradation(0.05))       # Dégradation
+    registry.register(Microglia, AttractantResponse(0.02))  # Réponse à c
+    return registry
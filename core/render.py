@@ -0,0 +1,248 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from matplotlib.collections import LineCollection
+
+
+''' Rendu vectorisé des graphes de cellules : une LineCollection pour les arêtes, une PathCollection pour les cellules '''
+
+
+def _fields(trajectory):
+    return trajectory.fields if hasattr(trajectory, "fields") else list(trajectory)
+
+
+def _frame_text(label, trajectory, frame):
+    if label is None:
+        return None
+    times = getattr(trajectory, "t", None)
+    return label.format(t=times[frame] if times is not None else frame, frame=frame)
+
+
+def edge_segments(positions, src, dst):
+    """Segments (m, 2, 2) des arêtes (src[e], dst[e]) dans le plan (x, y)."""
+    positions = np.asarray(positions)[:, :2]
+    segments = np.empty((len(src), 2, 2))
+    segments[:, 0] = positions[src]
+    segments[:, 1] = positions[dst]
+    return segments
+
+
+class CellGraphRenderer:
+    """
+    Dessin d'un graphe de cellules en deux artistes matplotlib, mis à jour
+    en place (update) d'une image à l'autre : toutes les arêtes forment une
+    seule LineCollection, toutes les cellules une seule PathCollection.
+    Les artistes renvoyés par update se prêtent au blitting (FuncAnimation
+    avec blit=True) : les axes ne sont jamais effacés.
+
+    ax : axes matplotlib
+    positions : np.array (n, 2), positions des cellules
+    edges : None ou (src, dst), indices des extrémités des arêtes
+    values : None ou np.array (n,), valeur par cellule (couleur et taille)
+    colors : couleur(s) fixe(s) des cellules quand values est None
+    cmap, vmin, vmax : échelle de couleur de values (vmax : max de values
+                       par défaut)
+    size, size_range : taille des cellules size + size_range * values / vmax
+    edge_color, edge_alpha, edge_width : style des arêtes
+    label : None ou format du texte affiché dans les axes, ex. "t = {t:g}"
+            (champs t et frame, cf. set_frame)
+    """
+
+    def __init__(self, ax, positions, edges=None, values=None, colors=None, cmap="viridis", vmin=0.0, vmax=None,
+                 size=100.0, size_range=300.0, edge_color="gray", edge_alpha=0.4, edge_width=1.0, label=None,
+                 value_field="u", position_field="positions"):
+        self.ax = ax
+        self.size = size
+        self.size_range = size_range
+        self.label = label
+        self.value_field = value_field
+        self.position_field = position_field
+
+        positions = np.asarray(positions)
+        src, dst = edges if edges is not None else (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp))
+        self._src = np.asarray(src, dtype=np.intp)
+        self._dst = np.asarray(dst, dtype=np.intp)
+        self._positions = positions
+
+        self.lines = LineCollection(edge_segments(positions, self._src, self._dst), colors=edge_color,
+                                    alpha=edge_alpha, linewidths=edge_width, zorder=1)
+        ax.add_collection(self.lines)
+
+        if values is not None:
+            values = np.asarray(values)
+            self.vmax = float(np.max(values)) if vmax is None else vmax
+            self.scatter = ax.scatter(positions[:, 0], positions[:, 1], s=self._sizes(values), c=values,
+                                      cmap=cmap, vmin=vmin, vmax=self.vmax, edgecolor='k', zorder=2)
+        else:
+            self.vmax = vmax
+            self.scatter = ax.scatter(positions[:, 0], positions[:, 1], s=size, c=colors, zorder=2)
+
+        self.text = ax.text(0.02, 0.98, "", transform=ax.transAxes, va="top", zorder=3)
+        ax.autoscale_view()
+
+    def _sizes(self, values):
+        if not self.size_range or not self.vmax:
+            return np.full(len(values), self.size)
+        return self.size + self.size_range * (values / self.vmax)
+
+    @property
+    def artists(self):
+        return self.lines, self.scatter, self.text
+
+    def update(self, positions=None, values=None, edges=None, text=None):
+        """
+        Met à jour les artistes en place (seuls les arguments fournis sont
+        pris en compte) et les renvoie.
+        """
+        if edges is not None:
+            self._src = np.asarray(edges[0], dtype=np.intp)
+            self._dst = np.asarray(edges[1], dtype=np.intp)
+        if positions is not None:
+            self._positions = np.asarray(positions)
+            self.scatter.set_offsets(self._positions[:, :2])
+        if positions is not None or edges is not None:
+            self.lines.set_segments(edge_segments(self._positions, self._src, self._dst))
+        if values is not None:
+            self.scatter.set_array(values)
+            self.scatter.set_sizes(self._sizes(values))
+        if text is not None:
+            self.text.set_text(text)
+        return self.artists
+
+    def set_frame(self, trajectory, frame, edges=None):
+        """
+        Affiche l'échantillon frame d'une trajectoire (TrajectoryReader ou
+        dict de tableaux) : positions, valeurs et, avec label, l'instant
+        trajectory.t[frame].
+
+        edges : None (inchangées), (src, dst) ou callable(frame, positions)
+                -> (src, dst) pour une topologie qui évolue
+        """
+        fields = _fields(trajectory)
+        positions = trajectory[self.position_field][frame] if self.position_field in fields else None
+        values = trajectory[self.value_field][frame] if self.value_field in fields else None
+        if callable(edges):
+            edges = edges(frame, positions if positions is not None else self._positions)
+        return self.update(positions, values, edges, _frame_text(self.label, trajectory, frame))
+
+    @classmethod
+    def from_trajectory(cls, ax, trajectory, frame=0, edges=None, **kwargs):
+        """Renderer initialisé sur l'échantillon frame de trajectory (cf. set_frame)."""
+        value_field = kwargs.get("value_field", "u")
+        position_field = kwargs.get("position_field", "positions")
+        fields = _fields(trajectory)
+        values = trajectory[value_field][frame] if value_field in fields else None
+        positions = trajectory[position_field][frame]
+        first = edges(frame, positions) if callable(edges) else edges
+        renderer = cls(ax, positions, edges=first, values=values, **kwargs)
+        renderer.set_frame(trajectory, frame)
+        return renderer
+
+
+class BarRenderer:
+    """
+    Diagramme en barres d'une valeur par sommet, mis à jour en place
+    (hauteurs des barres) ; même interface que CellGraphRenderer.
+
+    ax : axes matplotlib
+    values : np.array (n,), valeurs initiales
+    labels : None ou étiquettes des barres (par défaut v1, ..., vn)
+    vmax : borne haute de l'axe des ordonnées (x 1.1)
+    label : cf. CellGraphRenderer
+    """
+
+    def __init__(self, ax, values, labels=None, vmax=None, label=None, value_field="u"):
+        self.ax = ax
+        self.label = label
+        self.value_field = value_field
+        values = np.asarray(values)
+        labels = [f"v{i+1}" for i in range(len(values))] if labels is None else labels
+        self.bars = ax.bar(range(len(values)), values, tick_label=labels)
+        ax.set_ylim(0, (float(np.max(values)) if vmax is None else vmax) * 1.1)
+        self.text = ax.text(0.02, 0.98, "", transform=ax.transAxes, va="top")
+
+    @property
+    def artists(self):
+        return tuple(self.bars) + (self.text,)
+
+    def update(self, values=None, text=None):
+        if values is not None:
+            for bar, height in zip(self.bars, values):
+                bar.set_height(height)
+        if text is not None:
+            self.text.set_text(text)
+        return self.artists
+
+    def set_frame(self, trajectory, frame, edges=None):
+        return self.update(trajectory[self.value_field][frame], _frame_text(self.label, trajectory, frame))
+
+    @classmethod
+    def from_trajectory(cls, ax, trajectory, frame=0, edges=None, **kwargs):
+        renderer = cls(ax, trajectory[kwargs.get("value_field", "u")][frame], **kwargs)
+        renderer.set_frame(trajectory, frame)
+        return renderer
+
+
+def trajectory_max(trajectory, field="u", frames=None):
+    """Maximum d'un champ sur les échantillons frames, lus un par un."""
+    data = trajectory[field]
+    frames = range(len(data)) if frames is None else frames
+    return max(float(np.max(data[frame])) for frame in frames)
+
+
+def trajectory_limits(trajectory, field="positions", frames=None, margin=0.05):
+    """
+    Bornes ((xmin, xmax), (ymin, ymax)) des positions sur les échantillons
+    frames, lus un par un, élargies de margin fois l'étendue de chaque côté
+    (marge par défaut de matplotlib).
+    """
+    data = trajectory[field]
+    frames = range(len(data)) if frames is None else frames
+    low = np.full(2, np.inf)
+    high = np.full(2, -np.inf)
+    for frame in frames:
+        positions = np.asarray(data[frame])[:, :2]
+        if len(positions):
+            low = np.minimum(low, positions.min(axis=0))
+            high = np.maximum(high, positions.max(axis=0))
+    if not np.all(np.isfinite(low)):
+        return None
+    pad = margin * (high - low)
+    pad[pad == 0] = 0.5
+    return tuple((float(low[i] - pad[i]), float(high[i] + pad[i])) for i in range(2))
+
+
+def animate_trajectory(trajectory, edges=None, ax=None, frames=None, interval=50, blit=True, limits=None,
+                       label="t = {t:g}", **kwargs):
+    """
+    Animation d'une trajectoire de cellules (champs "positions" et "u" par
+    défaut) sans redessiner les axes : chaque image met à jour en place les
+    artistes d'un CellGraphRenderer.
+
+    edges : cf. CellGraphRenderer.set_frame
+    frames : None (tous les échantillons) ou indices des échantillons
+    limits : None ou ((xmin, xmax), (ymin, ymax)), fixées avant l'animation
+    kwargs : options de CellGraphRenderer (vmax : cf. trajectory_max)
+    """
+    if ax is None:
+        _, ax = plt.subplots(figsize=(6, 6))
+    n_frames = len(trajectory[kwargs.get("position_field", "positions")])
+    frames = list(range(n_frames) if frames is None else frames)
+    value_field = kwargs.get("value_field", "u")
+    if kwargs.get("vmax") is None and value_field in _fields(trajectory):
+        kwargs["vmax"] = trajectory_max(trajectory, value_field, frames)
+
+    renderer = CellGraphRenderer.from_trajectory(ax, trajectory, frames[0], edges=edges, label=label, **kwargs)
+    if limits is not None:
+        ax.set_xlim(*limits[0])
+        ax.set_ylim(*limits[1])
+
+    def init():
+        return renderer.artists
+
+    def update(frame):
+        return renderer.set_frame(trajectory, frame, edges=edges if callable(edges) else None)
+
+    anim = FuncAnimation(ax.figure, update, frames=frames, init_func=init, blit=blit, interval=interval)
+    anim.renderer = renderer
+    return anim
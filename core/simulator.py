@@ -0,0 +1,356 @@
+import numpy as np
+import scipy.sparse as sp
+
+from .cellgraph import CellGraph
+from .integrators import IMEX
+from .reactions import ReactionRegistry
+from .profiling import PROFILER
+
+try:
+    # Produit creux y += A x sans allocation. API privée de scipy.sparse
+    # (module _sparsetools) : elle peut disparaître ou changer d'une version
+    # à l'autre, d'où le repli sur A @ x dans Simulator._matvec.
+    from scipy.sparse._sparsetools import csr_matvec
+except ImportError:
+    csr_matvec = None
+
+
+def keller_segel_operator(src, dst, c, n):
+    """
+    Matrice creuse K (n, n) telle que K @ u = keller_segel_divergence(src, dst, u, c, n) :
+    à c fixé, le flux 0.5 (u_i + u_j)(c_j - c_i) est linéaire en u.
+    """
+    w = 0.5 * (c[dst] - c[src])
+    rows = np.concatenate([src, src, dst, dst])
+    cols = np.concatenate([src, dst, src, dst])
+    data = np.concatenate([w, w, -w, -w])
+    K = sp.coo_matrix((data, (rows, cols)), shape=(n, n)).tocsr()
+    K.sum_duplicates()
+    return K
+
+
+def _row_entries(M, rows):
+    """Positions des cases des lignes rows d'une matrice CSR, ligne et colonne de chacune."""
+    lo = M.indptr[rows]
+    counts = M.indptr[rows + 1] - lo
+    offsets = np.cumsum(counts) - counts
+    pos = np.repeat(lo - offsets, counts) + np.arange(int(counts.sum()))
+    return pos, np.repeat(rows, counts), M.indices[pos]
+
+
+class Simulator:
+    """
+    Moteur de simulation réaction–diffusion–chimiotactisme sur un graphe
+
+        du/dt = -D L u + chi div(u, c) + reaction(u)
+
+    À c fixé, -D L + chi K (K : divergence Keller–Segel, linéaire en u) est
+    assemblé une seule fois en un opérateur A, recalculé seulement quand
+    la topologie du graphe ou c changent. Le pas d'Euler explicite se fait
+    alors en place dans des tampons préalloués (un produit A @ u par pas).
+    Quand le graphe est mis à jour de façon incrémentale (update_edges),
+    A partage la disposition du laplacien en cache et seules les lignes
+    réécrites sont recalculées (cf. Graph.get_changed_rows).
+
+    system : Graph ou CellGraph
+    u0 : np.array (n,), état initial (copié)
+    diffusion : float ou np.array (n,)
+    c : None ou np.array (n,), champ attractif (cf. set_field)
+    chemotaxis : chi, coefficient du flux Keller–Segel (0 : pas de flux)
+    reaction : None, callable reaction(u) -> np.array, ou ReactionRegistry
+               (évalué sur la population du CellGraph avec c)
+    integrator : "euler" (explicite), "imex" (diffusion implicite) ou
+                 "crank_nicolson" (IMEX avec theta = 1/2)
+    normalized : bool, utilise le laplacien normalisé
+    dt : pas de temps par défaut de step / run
+    move_cells : avec un CellGraph, déplace les cellules et met à jour le
+                 graphe avant chaque pas (update_positions puis update_graph)
+    mobility_dt, bounds : paramètres de CellGraph.update_positions
+    connect_rule : règle passée à CellGraph.update_graph (None : inchangée)
+    """
+
+    INTEGRATORS = {"euler": None, "imex": 1.0, "crank_nicolson": 0.5}
+
+    def __init__(self, system, u0, diffusion=1.0, c=None, chemotaxis=1.0, reaction=None, integrator="euler",
+                 normalized=False, dt=0.01, move_cells=False, mobility_dt=None, bounds=(0, 3), connect_rule=None):
+        if integrator not in self.INTEGRATORS:
+            raise ValueError(f"Unknown integrator: {integrator!r}")
+        self.cellgraph = system if isinstance(system, CellGraph) else None
+        if self.cellgraph is None and (move_cells or isinstance(reaction, ReactionRegistry)):
+            raise TypeError("move_cells and ReactionRegistry reactions require a CellGraph.")
+        # Le CellGraph garde le même objet Graph lors des mises à jour
+        self.graph = system.graph if self.cellgraph is not None else system
+
+        self._diffusion = diffusion
+        self._chemotaxis = chemotaxis
+        self.reaction = reaction
+        self.integrator = integrator
+        self.normalized = normalized
+        self.dt = dt
+        self.move_cells = move_cells
+        self.mobility_dt = mobility_dt
+        self.bounds = bounds
+        self.connect_rule = connect_rule
+
+        self.u = np.array(u0, dtype=float)
+        self.t = 0.0
+        self.step_count = 0
+        n = self.graph.order
+        if self.u.shape != (n,):
+            raise ValueError(f"u0 must have shape ({n},), got {self.u.shape}")
+
+        self._c = None if c is None else np.asarray(c, dtype=float)
+        self._operator = None
+        self._operator_key = None
+        self._operator_source = None
+        self._laplacian = None
+        self._laplacian_key = None
+        self._laplacian_source = None
+        self._imex = None
+        self._observers = []
+
+        # Tampons de travail réutilisés à chaque pas
+        self._du = np.empty(n)
+        self._work = np.empty(n)
+
+    @property
+    def diffusion(self):
+        return self._diffusion
+
+    @diffusion.setter
+    def diffusion(self, diffusion):
+        self._diffusion = diffusion
+        self._operator = None
+        self._imex = None
+
+    @property
+    def chemotaxis(self):
+        return self._chemotaxis
+
+    @chemotaxis.setter
+    def chemotaxis(self, chemotaxis):
+        self._chemotaxis = chemotaxis
+        self._operator = None
+
+    @property
+    def c(self):
+        return self._c
+
+    def set_field(self, c):
+        """Change le champ attractif (l'opérateur est réassemblé au pas suivant)."""
+        self._c = None if c is None else np.asarray(c, dtype=float)
+        self._operator = None
+
+    def add_observer(self, callback, every=1):
+        """
+        callback(simulator, step, t, u) est appelé tous les every pas, après
+        le pas. u est l'état interne : le copier pour le conserver.
+        """
+        self._observers.append((callback, every))
+        return callback
+
+    # ----- Opérateurs -----
+
+    def laplacian(self):
+        g = self.graph
+        return g.get_normal_laplacian_matrix() if self.normalized else g.get_laplacian_matrix()
+
+    def _changed_rows(self, key, source):
+        # Lignes à recalculer d'un opérateur construit sur la disposition du
+        # laplacien source à la version key, ou None s'il faut tout refaire
+        g = self.graph
+        if self.normalized or key is None or source is None or key[0] != id(g):
+            return None
+        rows = g.get_changed_rows(key[1])
+        if rows is None or g.get_laplacian_matrix() is not source:
+            return None
+        return rows
+
+    def get_operator(self):
+        """
+        Opérateur linéaire A = -D L + chi K (creux si le graphe l'est),
+        mis en cache par version du graphe. Après update_edges, seules les
+        lignes réécrites du laplacien sont recalculées.
+        """
+        g = self.graph
+        key = (id(g), g.version)
+        if self._operator is not None and self._operator_key == key:
+            return self._operator
+
+        with PROFILER.timer("Simulator.get_operator"):
+            rows = self._changed_rows(self._operator_key, self._operator_source) if self._operator is not None else None
+            if rows is not None:
+                A = self._operator
+                self._fill_operator(A, self._operator_source, rows)
+            elif not self.normalized and g.get_changed_rows(g.version) is not None:
+                # Laplacien tenu à jour en place : A en reprend indptr et indices
+                L = g.get_laplacian_matrix()
+                A = sp.csr_matrix((np.empty(len(L.data)), L.indices, L.indptr), shape=L.shape)
+                A.indices, A.indptr = L.indices, L.indptr
+                self._fill_operator(A, L, np.arange(g.order))
+                self._operator_source = L
+            else:
+                A = self._assemble_operator()
+                self._operator_source = None
+
+        self._operator = A
+        self._operator_key = key
+        return A
+
+    def _assemble_operator(self):
+        g = self.graph
+        L = sp.csr_matrix(self.laplacian(), dtype=float)
+        D = self.diffusion
+        A = -(D * L) if np.ndim(D) == 0 else -(sp.diags(np.asarray(D, dtype=float)) @ L)
+        if self._c is not None and self.chemotaxis:
+            src, dst = g.get_edge_index()
+            A = A + self.chemotaxis * keller_segel_operator(src, dst, self._c, g.order)
+        A = sp.csr_matrix(A)
+        A.sum_duplicates()
+        if not g.is_sparse:
+            A = A.toarray()
+        return A
+
+    def _fill_operator(self, A, L, rows):
+        """
+        Recalcule les lignes rows de A = -D L + chi K, A ayant la disposition
+        de L (cases libres : zéros sur la diagonale, colonnes triées) :
+        K_ij = 0.5 (c_j - c_i) pour chaque arête, K_ii = sum_j K_ij.
+        """
+        pos, row_of, cols = _row_entries(L, rows)
+        lap = L.data[pos].astype(float)
+        D = self.diffusion
+        values = -(D if np.ndim(D) == 0 else np.asarray(D, dtype=float)[row_of]) * lap
+        if self._c is not None and self.chemotaxis:
+            c = self._c
+            k = np.where(cols != row_of, -0.5 * lap * (c[cols] - c[row_of]), 0.0)
+            values += self.chemotaxis * k
+            # Diagonale : première case de la ligne sur la colonne i
+            counts = L.indptr[rows + 1] - L.indptr[rows]
+            local = np.repeat(np.arange(len(rows)), counts)
+            below = np.bincount(local[cols < row_of], minlength=len(rows))
+            diag = np.cumsum(counts) - counts + below
+            values[diag] += self.chemotaxis * np.bincount(local, weights=k, minlength=len(rows))
+        A.data[pos] = values
+
+    def _float_laplacian(self):
+        """
+        Laplacien en flottants (CSR ou dense), mis en cache par version du
+        graphe ; après update_edges, seules les lignes réécrites sont recopiées.
+        """
+        g = self.graph
+        key = (id(g), g.version, self.normalized)
+        if self._laplacian is not None and self._laplacian_key == key:
+            return self._laplacian
+        rows = self._changed_rows(self._laplacian_key, self._laplacian_source) if self._laplacian is not None else None
+        if rows is not None:
+            pos, _, _ = _row_entries(self._laplacian_source, rows)
+            self._laplacian.data[pos] = self._laplacian_source.data[pos]
+        else:
+            L = self.laplacian()
+            self._laplacian_source = None
+            if isinstance(L, np.ndarray):
+                self._laplacian = np.asarray(L, dtype=float)
+            elif not self.normalized and g.get_changed_rows(g.version) is not None:
+                self._laplacian = sp.csr_matrix((L.data.astype(float), L.indices, L.indptr), shape=L.shape)
+                self._laplacian.indices, self._laplacian.indptr = L.indices, L.indptr
+                self._laplacian_source = L
+            else:
+                self._laplacian = sp.csr_matrix(L, dtype=float)
+        self._laplacian_key = key
+        return self._laplacian
+
+    def _matvec(self, A, x, out):
+        if isinstance(A, np.ndarray):
+            return np.matmul(A, x, out=out)
+        if csr_matvec is None:
+            out[...] = A @ x
+            return out
+        out.fill(0.0)
+        csr_matvec(A.shape[0], A.shape[1], A.indptr, A.indices, A.data, x, out)
+        return out
+
+    def _reaction(self, u):
+        if isinstance(self.reaction, ReactionRegistry):
+            return self.reaction.evaluate(self.cellgraph.population, u, self._c)
+        return self.reaction(u)
+
+    def rhs(self, u=None, out=None):
+        """Second membre A u + reaction(u) (dans out si fourni)."""
+        u = self.u if u is None else u
+        out = np.empty_like(u) if out is None else out
+        self._matvec(self.get_operator(), u, out)
+        if self.reaction is not None:
+            out += self._reaction(u)
+        return out
+
+    # ----- Diagnostics usuels -----
+
+    def mass(self):
+        return float(np.sum(self.u))
+
+    def lap_norm(self):
+        """||L u||, calculé dans un tampon de travail."""
+        return float(np.linalg.norm(self._matvec(self._float_laplacian(), self.u, self._work)))
+
+    def rhs_norm(self):
+        return float(np.linalg.norm(self.rhs(out=self._work)))
+
+    # ----- Boucle en temps -----
+
+    def _move(self):
+        cg = self.cellgraph
+        with PROFILER.timer("step/mobility"):
+            kwargs = {"bounds": self.bounds, "c": self._c}
+            if self.mobility_dt is not None:
+                kwargs["dt"] = self.mobility_dt
+            cg.update_positions(**kwargs)
+            cg.update_graph(connect_rule=self.connect_rule)
+
+    def _explicit(self, t, u):
+        # Partie explicite du schéma IMEX : chi div(u, c) + reaction(u)
+        du = np.zeros_like(u)
+        if self._c is not None and self.chemotaxis:
+            du += self.chemotaxis * self.graph.get_div_matrix(u, self._c)
+        if self.reaction is not None:
+            du += self._reaction(u)
+        return du
+
+    def step(self, dt=None):
+        """Avance l'état d'un pas de temps (en place pour Euler explicite)."""
+        dt = self.dt if dt is None else dt
+        if self.move_cells:
+            self._move()
+
+        u = self.u
+        theta = self.INTEGRATORS[self.integrator]
+        if theta is None:
+            du = self._du
+            with PROFILER.timer("step/operator"):
+                self._matvec(self.get_operator(), u, du)
+            if self.reaction is not None:
+                with PROFILER.timer("step/reaction"):
+                    du += self._reaction(u)
+            du *= dt
+            u += du
+        else:
+            with PROFILER.timer("step/implicit"):
+                if self._imex is None:
+                    self._imex = IMEX(self.graph, self._explicit, diffusion=self.diffusion,
+                                      normalized=self.normalized, theta=theta)
+                u[...] = self._imex.step(u, self.t, dt)
+
+        self.step_count += 1
+        self.t += dt
+        if self._observers:
+            with PROFILER.timer("step/observers"):
+                for callback, every in self._observers:
+                    if self.step_count % every == 0:
+                        callback(self, self.step_count - 1, self.t, u)
+        return u
+
+    def run(self, n_steps, dt=None):
+        """Effectue n_steps pas ; renvoie l'état final (tableau interne)."""
+        for _ in range(n_steps):
+            self.step(dt)
+        return self.u
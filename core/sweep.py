@@ -0,0 +1,150 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import scipy.sparse as sp
+
+from .graph import keller_segel_divergence
+
+
+''' Balayage de paramètres en parallèle sur des opérateurs partagés '''
+
+class SharedGraphOperators:
+    """
+    Place une fois pour toutes les tableaux d'un Graph (laplacien CSR et
+    extrémités des arêtes) dans multiprocessing.shared_memory.
+
+    Seul le descripteur spec (noms des blocs, formes, types) est envoyé aux
+    processus de calcul, qui relisent les tableaux sans copie.
+    """
+
+    def __init__(self, graph, normalized=False):
+        L = graph.get_normal_laplacian_matrix() if normalized else graph.get_laplacian_matrix()
+        L = sp.csr_matrix(L, dtype=float)
+        src, dst = graph.get_edge_index()
+
+        arrays = {"data": L.data, "indices": L.indices, "indptr": L.indptr, "src": src, "dst": dst}
+        self._blocks = []
+        self.spec = {"n": graph.order, "arrays": {}}
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            self._blocks.append(shm)
+            self.spec["arrays"][key] = (shm.name, array.shape, array.dtype.str)
+
+    def close(self):
+        """Libère les blocs de mémoire partagée."""
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Opérateurs déjà rattachés dans le processus courant, par nom de bloc
+_ATTACHED = {}
+
+
+def attach_operators(spec):
+    """
+    Rattache les tableaux partagés décrits par spec.
+    Renvoie (L, src, dst, n) ; le résultat est mis en cache par processus.
+    """
+    key = spec["arrays"]["data"][0]
+    if key not in _ATTACHED:
+        blocks, arrays = [], {}
+        for name, (shm_name, shape, dtype) in spec["arrays"].items():
+            shm = shared_memory.SharedMemory(name=shm_name)
+            blocks.append(shm)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        n = spec["n"]
+        L = sp.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=(n, n), copy=False)
+        _ATTACHED[key] = (L, arrays["src"], arrays["dst"], n, blocks)
+    L, src, dst, n, _ = _ATTACHED[key]
+    return L, src, dst, n
+
+
+def simulate_keller_segel(spec, u0, c, dk, dt, n_steps):
+    """
+    Simulation Keller–Segel de main.py (Euler explicite) sur des opérateurs
+    partagés. Renvoie un dictionnaire de diagnostics finaux.
+    """
+    start = time.perf_counter()
+    L, src, dst, n = attach_operators(spec)
+    u = np.array(np.broadcast_to(np.asarray(u0, dtype=float), (n,)))
+    c = np.asarray(c, dtype=float)
+
+    for _ in range(n_steps):
+        u += dt * (-dk * (L @ u) + keller_segel_divergence(src, dst, u, c, n))
+
+    return {"mass": float(np.sum(u)),
+            "lap_norm": float(np.linalg.norm(L @ u)),
+            "u_min": float(np.min(u)),
+            "u_max": float(np.max(u)),
+            "elapsed": time.perf_counter() - start}
+
+
+def _run_task(index, spec, task, dt, n_steps):
+    return index, simulate_keller_segel(spec, task["u0"], task["c"], task["dk"], dt, n_steps)
+
+
+class SweepRunner:
+    """
+    Balayage de paramètres (dk, c, u0, topologie) réparti sur un
+    ProcessPoolExecutor.
+
+    topologies : dict {nom : Graph}
+    tasks : liste de dict avec les clés "topology", "dk", "c", "u0"
+            (et toute autre clé, recopiée telle quelle dans le tableau)
+    """
+
+    # Colonnes numériques du tableau de résultats
+    RESULT_FIELDS = ("mass", "lap_norm", "u_min", "u_max", "elapsed")
+
+    def __init__(self, topologies, normalized=False, max_workers=None):
+        self.topologies = topologies
+        self.normalized = normalized
+        self.max_workers = max_workers
+        self.summary = []
+
+    def run(self, tasks, dt, n_steps):
+        """
+        Lance toutes les tâches et renvoie les lignes de résultats au fur et
+        à mesure qu'elles se terminent (générateur). Les lignes sont aussi
+        accumulées dans self.summary.
+        """
+        shared = {name: SharedGraphOperators(graph, self.normalized) for name, graph in self.topologies.items()}
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(_run_task, index, shared[task["topology"]].spec, task, dt, n_steps)
+                           for index, task in enumerate(tasks)]
+                for future in as_completed(futures):
+                    index, result = future.result()
+                    row = {key: value for key, value in tasks[index].items() if key not in ("c", "u0")}
+                    row["task"] = index
+                    row.update(result)
+                    self.summary.append(row)
+                    yield row
+        finally:
+            for operators in shared.values():
+                operators.close()
+
+    def run_all(self, tasks, dt, n_steps):
+        """Lance le balayage et renvoie le tableau récapitulatif trié par tâche."""
+        for _ in self.run(tasks, dt, n_steps):
+            pass
+        return self.table()
+
+    def table(self):
+        """Tableau structuré NumPy (une ligne par tâche terminée)."""
+        rows = sorted(self.summary, key=lambda row: row["task"])
+        dtype = [("task", int), ("topology", "U64"), ("dk", float)] + [(f, float) for f in self.RESULT_FIELDS]
+        return np.array([(row["task"], row["topology"], row["dk"]) + tuple(row[f] for f in self.RESULT_FIELDS)
+                         for row in rows], dtype=dtype)
@@ -0,0 +1,169 @@
+import json
+import os
+
+import numpy as np
+
+
+''' Stockage de trajectoires par blocs .npy projetés en mémoire '''
+
+FORMAT_VERSION = 1
+
+
+class TrajectoryWriter:
+    """
+    Écrit une trajectoire au fil de la simulation dans des fichiers .npy
+    préalloués (np.lib.format.open_memmap), par blocs de chunk_size
+    échantillons : la mémoire utilisée reste bornée quelle que soit la
+    durée de la simulation.
+
+    path : répertoire de sortie (créé si besoin)
+    fields : dict {nom : forme d'un échantillon}, ex. {"u": (n,), "positions": (n, 2)}
+    stride : on ne garde qu'un appel à append sur stride
+    chunk_size : nombre d'échantillons par fichier
+    """
+
+    def __init__(self, path, fields, stride=1, chunk_size=1024, dtype=float):
+        self.path = path
+        self.fields = {name: tuple(shape) for name, shape in fields.items()}
+        self.stride = stride
+        self.chunk_size = chunk_size
+        self.dtype = np.dtype(dtype)
+
+        os.makedirs(path, exist_ok=True)
+        self._calls = 0
+        self._count = 0
+        self._chunks = {}
+        self._times = []
+
+    def _chunk_file(self, name, chunk):
+        return os.path.join(self.path, f"{name}_{chunk:05d}.npy")
+
+    def append(self, t, **values):
+        """
+        Enregistre un échantillon à l'instant t si l'appel tombe sur le pas
+        de sortie. Renvoie True si l'échantillon a été écrit.
+        """
+        keep = self._calls % self.stride == 0
+        self._calls += 1
+        if not keep:
+            return False
+
+        chunk, row = divmod(self._count, self.chunk_size)
+        if row == 0:
+            self._flush()
+            self._chunks = {name: np.lib.format.open_memmap(self._chunk_file(name, chunk), mode="w+",
+                                                            dtype=self.dtype, shape=(self.chunk_size,) + shape)
+                            for name, shape in self.fields.items()}
+        for name, value in values.items():
+            self._chunks[name][row] = value
+        self._times.append(t)
+        self._count += 1
+        return True
+
+    def _flush(self):
+        for mm in self._chunks.values():
+            mm.flush()
+        self._chunks = {}
+
+    def close(self):
+        """Vide les tampons et écrit les métadonnées (meta.json, t.npy)."""
+        self._flush()
+        np.save(os.path.join(self.path, "t.npy"), np.asarray(self._times, dtype=float))
+        meta = {"version": FORMAT_VERSION,
+                "fields": {name: list(shape) for name, shape in self.fields.items()},
+                "dtype": self.dtype.str,
+                "stride": self.stride,
+                "chunk_size": self.chunk_size,
+                "count": self._count}
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryField:
+    """
+    Accès paresseux à un champ d'une trajectoire : seules les tranches
+    demandées sont lues (les blocs sont projetés en mémoire).
+    """
+
+    def __init__(self, reader, name):
+        self._reader = reader
+        self.name = name
+        self.shape = (len(reader),) + tuple(reader.meta["fields"][name])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _chunk(self, chunk):
+        return self._reader._open(self.name, chunk)
+
+    def __getitem__(self, index):
+        n = len(self)
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += n
+            if not 0 <= index < n:
+                raise IndexError(f"Sample {index} out of range for {n} samples.")
+            chunk, row = divmod(index, self._reader.chunk_size)
+            return self._chunk(chunk)[row]
+
+        indices = np.arange(n)[index]
+        out = np.empty((len(indices),) + self.shape[1:], dtype=self._reader.dtype)
+        chunks, rows = np.divmod(indices, self._reader.chunk_size)
+        for chunk in np.unique(chunks):
+            sel = chunks == chunk
+            out[sel] = self._chunk(chunk)[rows[sel]]
+        return out
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class TrajectoryReader:
+    """
+    Relecture d'une trajectoire écrite par TrajectoryWriter.
+
+        reader = TrajectoryReader(path)
+        reader.t             # instants
+        reader["u"][frame]   # un échantillon, lu à la demande
+    """
+
+    def __init__(self, path, mmap_mode="r"):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] > FORMAT_VERSION:
+            raise ValueError(f"Unsupported trajectory format version {self.meta['version']}.")
+        self.chunk_size = self.meta["chunk_size"]
+        self.dtype = np.dtype(self.meta["dtype"])
+        self.t = np.load(os.path.join(path, "t.npy"))
+        self._open_chunks = {}
+
+    def _open(self, name, chunk):
+        key = (name, chunk)
+        if key not in self._open_chunks:
+            self._open_chunks[key] = np.load(os.path.join(self.path, f"{name}_{chunk:05d}.npy"),
+                                             mmap_mode=self.mmap_mode)
+        return self._open_chunks[key]
+
+    @property
+    def fields(self):
+        return list(self.meta["fields"])
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def __getitem__(self, name):
+        if name not in self.meta["fields"]:
+            raise KeyError(name)
+        return TrajectoryField(self, name)
@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
@@ -5,6 +8,9 @@ from matplotlib.animation import FuncAnimation
 from core import(Vertex,
                  Edge,
                  Graph)
+from core.trajectory import (TrajectoryWriter, TrajectoryReader)
+from core.simulator import Simulator
+from core.export import export_frames
 # ___________________________________________________________________________ #
 
 # Coefficient de diffusion
@@ -16,6 +22,10 @@ M = 100
 dt = 1 / (M - 1)
 t = np.linspace(0,T,M)
 
+# Répertoire d'export des animations en images PNG (rendu Agg en
+# parallèle, sans affichage) ; None : animations interactives
+EXPORT_DIR = None
+
 if __name__ == '__main__':
     
     v1 = Vertex(ids=1, value=1.0)
@@ -27,7 +37,7 @@ if __name__ == '__main__':
     e3 = Edge(extremity=[v1,v3], ids=3, coeff=dk)
     
     '''Construction d'un graphe étoilé'''
-    G = Graph([v1, v2, v3], [e1, e2, e3])
+    G = Graph([v1, v2, v3], [e1, e2, e3], sparse=True)
     
     print(G, '\n')
 
@@ -35,28 +45,28 @@ if __name__ == '__main__':
     Choisir si on travaille sur le graphe 1 ou 2
     '''
     lap = G.get_normal_laplacian_matrix()
-    print('laplacien : ',lap, '\n')
+    print('laplacien : ',lap.toarray(), '\n')
     
     A = G.get_adjacency_matrix()
-    print("Adj : ", A, '\n')
+    print("Adj : ", A.toarray(), '\n')
     
     B = lap
     for i in range(6):
         B = B @ lap
-        print(B, '\n')
+        print(B.toarray(), '\n')
     
     
     # Liste de noeuds et d'arrêtes
     vertices = [v1, v2, v3]
     edges = [e1, e2, e3]
     
-    u = [vertex.value for vertex in vertices]
+    u = np.array([vertex.value for vertex in vertices])
     
     # Conservation de la masse en stationnaire
     '''
     On cherche le vecteur propre associé à la valeur propre nulle
     '''
-    eigvals, eigvecs = np.linalg.eig(lap)
+    eigvals, eigvecs = np.linalg.eig(lap.toarray())
     idx = np.argmin(np.abs(eigvals))
     stationnaire = eigvecs[:, idx].real
     stationnaire *= sum(u) / sum(stationnaire)
@@ -71,32 +81,20 @@ if __name__ == '__main__':
     '''################'''
     
     # Coefficient de diffusion
-    ## Diffusion isotrope donc matrice diagonale de forme dk*Id
-    D = np.eye(len(u))*1.0
+    ## Diffusion isotrope donc matrice diagonale de forme dk*Id,
+    ## représentée par le scalaire dk (pas de produit matriciel dense)
+    D = 1.0
     
-    ## Itération en temps
-    U_over_time = []
-    V=[]
+    ## Solution exacte u(t) = exp(-t D L) u0 aux instants des pas de temps
+    ## (pas de condition de stabilité, aucun pas d'Euler)
+    U_over_time = G.propagate(u, dt * np.arange(1, len(t) + 1), diffusion=D, normalized=True)
+    u = U_over_time[-1]
     
-    U=[] # Stockage des normes de u
-    S=[] # Stockage de la masse totale
+    U = np.linalg.norm(U_over_time, axis=1) # Stockage des normes de u
+    S = np.sum(U_over_time, axis=1)         # Stockage de la masse totale
     
-
-    for i in range(len(t)):
-        du = -dt * D @ lap @ u      # variation diffusion seule
-        u = u + du                  # mise à jour de u
-        
-        # Stockage pour animation
-        U_over_time.append(u.copy())
-        
-        # Norme et masse totale
-        res = np.linalg.norm(u)
-        s = np.sum(u)
-        U.append(res)
-        S.append(s)
-        
-        # Stockage des variations instantanées
-        V.append(np.linalg.norm(lap @ u))  # v = L u
+    # Stockage des variations instantanées
+    V = np.linalg.norm(lap @ U_over_time.T, axis=0)  # v = L u
         
         
     '''
@@ -131,20 +129,24 @@ if __name__ == '__main__':
     
     # Animation
     
-    fig, ax = plt.subplots(figsize=(6,4))
-    bar_container = ax.bar(range(len(u)), U_over_time[0], tick_label=[f"v{i+1}" for i in range(len(u))])
-    ax.set_ylim(0, max([max(u_t) for u_t in U_over_time]) * 1.1)
-    ax.set_ylabel("Valeur de u")
-    ax.set_xlabel("Noeuds")
-    ax.set_title("Évolution de u sur les noeuds")
-    
-    def animate(frame):
-        for bar, height in zip(bar_container, U_over_time[frame]):
-            bar.set_height(height)
-        return bar_container
-    
-    anim = FuncAnimation(fig, animate, frames=len(U_over_time), interval=50, blit=False)
-    plt.show()
+    if EXPORT_DIR is not None:
+        export_frames({"u": U_over_time}, os.path.join(EXPORT_DIR, "diffusion"), kind="bars",
+                      figsize=(6,4), label="pas {frame}")
+    else:
+        fig, ax = plt.subplots(figsize=(6,4))
+        bar_container = ax.bar(range(len(u)), U_over_time[0], tick_label=[f"v{i+1}" for i in range(len(u))])
+        ax.set_ylim(0, max([max(u_t) for u_t in U_over_time]) * 1.1)
+        ax.set_ylabel("Valeur de u")
+        ax.set_xlabel("Noeuds")
+        ax.set_title("Évolution de u sur les noeuds")
+        
+        def animate(frame):
+            for bar, height in zip(bar_container, U_over_time[frame]):
+                bar.set_height(height)
+            return bar_container
+        
+        anim = FuncAnimation(fig, animate, frames=len(U_over_time), interval=50, blit=False)
+        plt.show()
     
     
     
@@ -152,7 +154,7 @@ if __name__ == '__main__':
 #%% Analyse spectrale (Graph Fourier Transform)
 
     # Décomposition spectrale du Laplacien
-    eigvals, eigvecs = np.linalg.eigh(lap)
+    eigvals, eigvecs = np.linalg.eigh(lap.toarray())
     
     # Préparation du graphe de Fourier initial
     u_hat0 = eigvecs.T @ U_over_time[0]
@@ -201,14 +203,14 @@ if __name__ == '__main__':
     edges = [e1, e2]
     
     '''Construction d'un graphe étoilé'''
-    G = Graph([v1, v2, v3], [e1, e2])
+    G = Graph([v1, v2, v3], [e1, e2], sparse=True)
     print(G, '\n')
     '''Pour un graphe en chaine : utiliser le grpahe ci dessous'''
     # G = Graph([v1, v2, v3], [e1, e2])
     
     lap = G.get_normal_laplacian_matrix()
     
-    u = [vertex.value for vertex in vertices]
+    u = np.array([vertex.value for vertex in vertices])
 
     # Pas sûr si la formulation de la divergence est bonne (c.f. classe Graphe)
     c = np.array([5, 0.5, 0.5])
@@ -218,28 +220,36 @@ if __name__ == '__main__':
     print(div)
     
     
-    U_list = []  # norme de u
-    S_list = []  # masse totale
-    V_list = []
-    VV_list = []
-    UU_list = []
+    # Etats et diagnostics écrits sur disque au fil de l'eau (mémoire bornée)
+    traj_dir = tempfile.mkdtemp(prefix="main_keller_segel_")
+    writer = TrajectoryWriter(traj_dir, {"u": u.shape,   # u
+                                         "norm": (),     # norme de u
+                                         "mass": (),     # masse totale
+                                         "rhs_norm": (), # ||- D L u + div||
+                                         "lap_norm": ()}, stride=1)
     
-    # iteration en temps
+    # iteration en temps : u += dt * (- D L u + div)
+    ## Le flux Keller-Segel reste figé à sa valeur initiale div : il est
+    ## passé comme terme source constant
+    sim = Simulator(G, u, diffusion=D, normalized=True, reaction=lambda u: div, dt=dt)
     
-    for i in range(len(t)):
-        # Calcul du flux Keller-Segel
-        # divergence chimio-attractif
+    # Stockage des variations instantanées
+    @sim.add_observer
+    def record(sim, step, time, u):
+        writer.append(t[step], u=u, norm=np.linalg.norm(u), mass=sim.mass(),
+                      rhs_norm=sim.rhs_norm(), lap_norm=sim.lap_norm())
     
-        # diffusion + flux
-        u = u + dt * (- D @ lap @ u + div)
+    u = sim.run(len(t)).copy()
     
-        U_list.append(np.linalg.norm(u))
-        UU_list.append(u.copy())
-        S_list.append(np.sum(u))
-        
-        # Stockage des variations instantanées
-        V_list.append(np.linalg.norm(- D @ lap @ u + div))  # v = L u
-        VV_list.append(np.linalg.norm(lap @ u))
+    writer.close()
+    
+    # Relecture paresseuse de la trajectoire
+    trajectory = TrajectoryReader(traj_dir)
+    U_list = trajectory["norm"][:]
+    S_list = trajectory["mass"][:]
+    V_list = trajectory["rhs_norm"][:]
+    VV_list = trajectory["lap_norm"][:]
+    UU_list = trajectory["u"]
     
     '''
     PLOT
@@ -292,19 +302,24 @@ if __name__ == '__main__':
     
     
     # --- Animation ---
-    fig10, ax10 = plt.subplots(figsize=(6,4))
-    bar_container10 = ax10.bar(range(len(u)), UU_list[0], tick_label=[f"v{i+1}" for i in range(len(u))])
-    ax10.set_ylim(0, max([max(u_t) for u_t in UU_list]) * 1.1)
-    ax10.set_ylabel("Valeur de u")
-    ax10.set_xlabel("Noeuds")
-    ax10.set_title("Évolution de u sur les noeuds en reaction + diffusion")
-    
-    def update(frame):
-        for rect, h in zip(bar_container10, UU_list[frame]):
-            rect.set_height(h)
-        return bar_container10
-    
-    anim10 = FuncAnimation(fig10, update, frames=len(UU_list), interval=100, blit=False)
-    plt.show()
+    if EXPORT_DIR is not None:
+        # Les processus relisent la trajectoire projetée en mémoire
+        export_frames(trajectory, os.path.join(EXPORT_DIR, "keller_segel"), kind="bars", figsize=(6,4),
+                      label="t = {t:.3g}")
+    else:
+        fig10, ax10 = plt.subplots(figsize=(6,4))
+        bar_container10 = ax10.bar(range(len(u)), UU_list[0], tick_label=[f"v{i+1}" for i in range(len(u))])
+        ax10.set_ylim(0, max(np.max(u_t) for u_t in UU_list) * 1.1)
+        ax10.set_ylabel("Valeur de u")
+        ax10.set_xlabel("Noeuds")
+        ax10.set_title("Évolution de u sur les noeuds en reaction + diffusion")
+        
+        def update(frame):
+            for rect, h in zip(bar_container10, UU_list[frame]):
+                rect.set_height(h)
+            return bar_container10
+        
+        anim10 = FuncAnimation(fig10, update, frames=len(UU_list), interval=100, blit=False)
+        plt.show()
     
 
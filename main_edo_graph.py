@@ -1,10 +1,25 @@
+import os
+import tempfile
+
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 
 from core.Cell.cell import Cell, Neuron, Astrocyte, Microglia
 from core.point import Point
 from core.cellgraph import CellGraph
+from core.simulator import Simulator
+from core.reactions import default_reactions
+from core.trajectory import TrajectoryWriter, TrajectoryReader
+from core.profiling import PROFILER
+from core.render import animate_trajectory
+from core.export import export_frames
+
+# Chronométrage par étape du pas de temps (rapport affiché en fin de boucle)
+PROFILE = False
+
+# Répertoire d'export des images PNG (rendu Agg en parallèle, sans
+# affichage) ; None : animation interactive
+EXPORT_DIR = None
 
 # Création des cellules
 cells = [
@@ -15,11 +30,11 @@ cells = [
     Microglia(pos=Point(1.5, 2)),
 ]
 
-cg = CellGraph(cells, connect_rule="fully_connected")
+cg = CellGraph(cells, connect_rule="fully_connected", sparse=True)
 
 # Initialisation
 u = cg.set_density()
-D = np.eye(len(u)) * 0.05
+D = 0.05  # diffusion isotrope D = 0.05 * Id
 
 # Champ attractif (fixe pour l'instant)
 c = np.random.rand(len(cells))
@@ -30,87 +45,51 @@ M = 200
 dt = T / M
 t = np.linspace(0, T, M)
 
-# Stockage
-U_over_time = []
-Positions_over_time = []
-
-for step in range(M):
-    # 1. Mettre à jour les positions des cellules mobiles
-    cg.update_positions(dt=0.05, bounds=(0, 3))
-    
-    # Stocker les positions actuelles
-    current_positions = {v._ids: (cell.pos[0], cell.pos[1]) for v, cell in zip(cg.vertices, cg.cells)}
-    Positions_over_time.append(current_positions)
-
-
-    # 2. Recalculer graphe (voisinages et matrices)
-    cg.update_graph(connect_rule="fully_connected")
-
-    # 3. Recalculer le Laplacien
-    lap = cg.graph.get_laplacian_matrix()
-
-    # 4. Diffusion
-    du_diff = -dt * D @ lap @ u
-
-    # 5. Réaction locale (exemples simples)
-    du_reac = np.zeros_like(u)
-    for idx, cell in enumerate(cg.cells):
-        if isinstance(cell, Neuron):
-            du_reac[idx] = dt * (0.1 * u[idx] * (1 - u[idx]))  # Croissance logistique
-        elif isinstance(cell, Astrocyte):
-            du_reac[idx] = dt * (-0.05 * u[idx])               # Dégradation
-        elif isinstance(cell, Microglia):
-            du_reac[idx] = dt * (0.02 * c[idx])                # Réponse à c
-
-    # 6. Mise à jour de u
-    u += du_diff + du_reac
-    U_over_time.append(u.copy())
-
-# Animation / Visualisation
-
-fig, ax = plt.subplots(figsize=(6, 6))
-
-# Initialisation des points et arêtes
-scat = ax.scatter([], [], s=[], c=[], cmap='viridis', vmin=0, vmax=np.max(U_over_time), edgecolor='k')
-lines = []
-
-def init():
-    ax.set_xlim(-1, 3)
-    ax.set_ylim(-1, 3)
-    return scat,
-
-def update(frame):
-    ax.clear()
-
-    # Récupérer les positions et valeurs à cet instant
-    u_frame = U_over_time[frame]
-    #positions = {v._ids: (cells[idx].pos[0], cells[idx].pos[1]) for idx, v in enumerate(cg.vertices)}
-    positions = Positions_over_time[frame]
-
-
-    # Tracer les arêtes
-    for edge in cg.edges:
-        id1, id2 = edge._extremity[0]._ids, edge._extremity[1]._ids
-        x_vals = [positions[id1][0], positions[id2][0]]
-        y_vals = [positions[id1][1], positions[id2][1]]
-        ax.plot(x_vals, y_vals, 'gray', alpha=0.4)
-
-    # Tracer les cellules
-    pos_array = np.array(list(positions.values()))
-    color_array = u_frame
-    size_array = 100 + 300 * (u_frame / np.max(U_over_time))  # Taille proportionnelle à u
-
-    scat = ax.scatter(pos_array[:, 0], pos_array[:, 1], s=size_array, c=color_array,
-                      cmap='viridis', vmin=0, vmax=np.max(U_over_time), edgecolor='k')
-
-    ax.set_title(f"t = {frame*dt}")
-    ax.set_xlim(-1, 3)
-    ax.set_ylim(-1, 3)
-    return scat,
-
-# Créer l'animation
-anim = FuncAnimation(fig, update, frames=len(U_over_time), init_func=init, blit=False, interval=50)
-
-plt.show()
-
-
+# Réactions locales par type : croissance logistique (Neuron),
+# dégradation (Astrocyte), réponse à c (Microglia)
+reactions = default_reactions()
+
+# Stockage : trajectoire écrite sur disque par blocs (mémoire bornée)
+traj_dir = tempfile.mkdtemp(prefix="main_edo_graph_")
+writer = TrajectoryWriter(traj_dir, {"u": u.shape, "positions": cg.population.positions.shape}, stride=1)
+u_max = -np.inf
+
+# Boucle en temps : à chaque pas, déplacement des Microglia, mise à jour du
+# graphe, puis Euler explicite u += dt * (-D L u + réaction)
+sim = Simulator(cg, u, diffusion=D, c=c, chemotaxis=0.0, reaction=reactions, dt=dt,
+                move_cells=True, mobility_dt=0.05, bounds=(0, 3), connect_rule="fully_connected")
+
+@sim.add_observer
+def record(sim, step, time, u):
+    global u_max
+    # Positions stockées avec u à la fin du pas
+    writer.append(step * dt, u=u, positions=cg.population.positions)
+    u_max = max(u_max, np.max(u))
+
+if PROFILE:
+    PROFILER.enable()
+
+u = sim.run(M)
+
+writer.close()
+
+if PROFILE:
+    PROFILER.disable()
+    print(PROFILER.table())
+    PROFILER.to_json(os.path.join(traj_dir, "profile.json"), script="main_edo_graph", steps=M)
+
+# Animation / Visualisation (lecture paresseuse de la trajectoire)
+trajectory = TrajectoryReader(traj_dir)
+if EXPORT_DIR is not None:
+    paths = export_frames(trajectory, EXPORT_DIR, edges=cg.graph.get_edge_index(), vmax=u_max,
+                          limits=((-1, 3), (-1, 3)), label="t = {t:g}")
+    print(f"{len(paths)} images écrites dans {EXPORT_DIR}")
+else:
+    fig, ax = plt.subplots(figsize=(6, 6))
+
+    # Arêtes (graphe complet, topologie fixe) et cellules dessinées une seule
+    # fois puis mises à jour en place à chaque image (blitting)
+    anim = animate_trajectory(trajectory, edges=cg.graph.get_edge_index(), ax=ax, vmax=u_max,
+                              limits=((-1, 3), (-1, 3)), label="t = {t:g}", interval=50)
+
+    plt.show()